@@ -0,0 +1,166 @@
+"""
+Command-line interface to DatasetManager:
+
+    python -m scripts add "Prove that ..." --dataset-type math
+    python -m scripts remove 12 13 --dataset-type leetcode
+    python -m scripts list --dataset-type leetcode --model gpt-4o
+    python -m scripts generate 1 2 3 --dataset-type leetcode --models gpt-4o o1-preview
+    python -m scripts eval scores.csv --dataset-type leetcode
+    python -m scripts stats --dataset-type leetcode
+
+The dataset folder is taken from --dataset-folder, then $PROBLEMSET_DATASET_FOLDER, then the repository root.
+Only the modules a command needs are imported, so dataset edits and queries never load openai or requests.
+"""
+import argparse
+import json
+import sys
+
+DATASET_TYPES = ["math", "leetcode"]
+STORAGES = ["json", "journal", "sqlite"]
+
+
+def _manager(args, in_memory=False):
+    from .data_manager import DatasetManager, default_dataset_folder
+    from .storage import JournalStorage, JsonFileStorage, SqliteStorage
+
+    folder = args.dataset_folder or default_dataset_folder()
+    storage = {"json": JsonFileStorage, "journal": JournalStorage, "sqlite": SqliteStorage}[args.storage](folder)
+    return DatasetManager(folder, in_memory=in_memory, storage=storage)
+
+
+def add(args):
+    problem = sys.stdin.read() if args.problem == "-" else args.problem
+    problem_id = _manager(args).add_problem(problem, args.dataset_type, title_slug=args.title_slug,
+                                            near_duplicate_threshold=args.near_duplicate_threshold)
+    return 0 if problem_id is not None else 1
+
+
+def remove(args):
+    # Every removal is applied in memory and written once
+    with _manager(args, in_memory=True) as manager:
+        removed = [manager.remove_problem(problem_id, args.dataset_type) for problem_id in args.problem_ids]
+    return 0 if all(removed) else 1
+
+
+def list_problems(args):
+    dataset = _manager(args)._load_dataset(args.dataset_type)
+    rows = []
+    for problem_id, entry in dataset.items():
+        models = [key for key, value in entry.items() if isinstance(value, dict) and value.get("solution")]
+        if args.model and args.model not in models:
+            continue
+        rows.append((problem_id, entry, models))
+    for problem_id, entry, models in rows[:args.limit]:
+        title = entry.get("title_slug") or " ".join(entry["problem"].split())[:60]
+        print(f"{problem_id:>6}  {title:<60}  {', '.join(models)}")
+    print(f"{len(rows)} problems" + (f" (showing {args.limit})" if args.limit and len(rows) > args.limit else ""))
+
+
+def generate(args):
+    manager = _manager(args)
+    if len(args.problem_ids) == 1 and len(args.models) == 1 and not args.concurrency:
+        solution = manager.prompt_llm(args.api_key, args.problem_ids[0], args.models[0], args.dataset_type,
+                                      base_url=args.base_url, stream=args.stream)
+        return 0 if solution is not None else 1
+    results = manager.prompt_llm_batch(args.api_key, args.problem_ids, models=args.models,
+                                       dataset_type=args.dataset_type, max_concurrency=args.concurrency or 4,
+                                       base_url=args.base_url, stream=args.stream)
+    return 0 if len(results) == len(args.problem_ids) * len(args.models) else 1
+
+
+def evaluate(args):
+    from .evaluation import load_evaluations
+
+    if args.path:
+        evaluations = load_evaluations(args.path)
+    elif args.problem_id and args.model:
+        evaluation = {"problem_id": args.problem_id, "model_name": args.model, "feedback": args.feedback}
+        for score in args.score or []:
+            name, sep, value = score.partition("=")
+            if not sep:
+                raise SystemExit(f"Invalid score '{score}'. Use name=value, e.g. runtime_beats=80.5.")
+            evaluation[name] = value
+        evaluations = [evaluation]
+    else:
+        raise SystemExit("Pass a CSV/JSON-lines file or --problem-id, --model and --score name=value.")
+    result = _manager(args).eval_many(evaluations, args.dataset_type, skip_invalid=args.skip_invalid)
+    return 1 if result["errors"] else 0
+
+
+def stats(args):
+    if not args.compare and (args.metric or args.by):
+        # Reported as an argument error by main()
+        raise ValueError("--metric and --by only apply with --compare MODEL_A MODEL_B.")
+    manager = _manager(args)
+    if args.compare:
+        result = manager.compare(args.compare[0], args.compare[1], args.dataset_type, metric=args.metric, by=args.by)
+    elif args.generation:
+        result = manager.generation_summary(args.dataset_type, args.models)
+    else:
+        result = manager.summary(args.dataset_type, args.models)
+    print(json.dumps(result, indent=2))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scripts", description="Manage the math and LeetCode datasets.")
+    parser.add_argument("--dataset-folder",
+                        help="Dataset folder (default: $PROBLEMSET_DATASET_FOLDER or the repository root).")
+    parser.add_argument("--storage", choices=STORAGES, default="json", help="Storage backend (see scripts/storage.py).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, func, help):
+        sub = commands.add_parser(name, help=help)
+        sub.add_argument("--dataset-type", choices=DATASET_TYPES, default="math")
+        sub.set_defaults(func=func)
+        return sub
+
+    sub = command("add", add, "Add a problem.")
+    sub.add_argument("problem", help="Problem text, or - to read it from stdin.")
+    sub.add_argument("--title-slug")
+    sub.add_argument("--near-duplicate-threshold", type=float)
+
+    sub = command("remove", remove, "Remove problems by ID.")
+    sub.add_argument("problem_ids", nargs="+")
+
+    sub = command("list", list_problems, "List problems and the models that have solutions for them.")
+    sub.add_argument("--model", help="Only list problems with a solution from this model.")
+    sub.add_argument("--limit", type=int, help="Show at most this many problems.")
+
+    sub = command("generate", generate, "Generate solutions with one or more models.")
+    sub.add_argument("problem_ids", nargs="+")
+    sub.add_argument("--models", nargs="+", default=["gpt-4o"])
+    sub.add_argument("--api-key", help="API key (default: the provider's environment variable, e.g. OPENAI_API_KEY).")
+    sub.add_argument("--base-url")
+    sub.add_argument("--stream", action="store_true")
+    sub.add_argument("--concurrency", type=int, help="Concurrent requests (default: 4 for several problems or models).")
+
+    sub = command("eval", evaluate, "Store evaluation scores from a CSV/JSON-lines file or the command line.")
+    sub.add_argument("path", nargs="?", help="CSV or JSON-lines file with problem_id, model_name and scores.")
+    sub.add_argument("--problem-id")
+    sub.add_argument("--model")
+    sub.add_argument("--score", action="append", help="A rubric score as name=value; repeat for each score.")
+    sub.add_argument("--feedback")
+    sub.add_argument("--skip-invalid", action="store_true", help="Store the valid rows even if others are invalid.")
+
+    sub = command("stats", stats, "Summarize evaluation metrics, generation usage, or compare two models.")
+    sub.add_argument("--models", nargs="+")
+    sub.add_argument("--compare", nargs=2, metavar=("MODEL_A", "MODEL_B"))
+    sub.add_argument("--metric")
+    sub.add_argument("--by", choices=["tag", "length"])
+    sub.add_argument("--generation", action="store_true", help="Summarize latency and token usage instead.")
+    return parser
+
+
+def main(argv=None):
+    """Run a command and return its exit status: 0 on success, 1 if it failed, 2 for invalid arguments."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args) or 0
+    except ValueError as e:
+        # e.g. an unknown metric or model; report it like an argument error instead of a traceback
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import numpy as np
+
+# Metrics collected per dataset type. local_* metrics come from benchmark_solutions (see solution_benchmark.py).
+METRICS = {
+    "math": ["weighted_score", "correctness_final", "correctness_steps", "clarity_explanation", "completeness",
+             "appropriate_methods"],
+    "leetcode": ["weighted_average", "simple_average", "runtime_beats", "memory_beats", "local_pass_rate",
+                 "local_runtime_ms", "local_peak_memory_kb"],
+}
+DEFAULT_METRIC = {"math": "weighted_score", "leetcode": "weighted_average"}
+LOWER_IS_BETTER = {"local_runtime_ms", "local_peak_memory_kb"}
+# Entry keys that hold problem data rather than a model's results
+ENTRY_FIELDS = ("problem", "title_slug", "tags")
+# Per-call measurements stored under a solution's "generation" key by prompt_llm/prompt_llm_batch
+GENERATION_TIMINGS = ["latency_s", "time_to_first_token_s"]
+GENERATION_TOKENS = ["prompt_tokens", "completion_tokens", "reasoning_tokens", "total_tokens"]
+
+
+def _metric_values(model_data, metrics):
+    """Flatten the stored metrics of one model's entry, including the local benchmark results."""
+    # Only metric keys are read so that lazily loaded solution texts (see storage.LazyEntry) stay unloaded
+    values = {metric: model_data[metric] for metric in metrics if metric in model_data}
+    local = model_data.get("local_benchmark") or {}
+    if local.get("total"):
+        values["local_pass_rate"] = local["passed"] / local["total"]
+    if "runtime_ms" in local:
+        values["local_runtime_ms"] = local["runtime_ms"]
+    if "peak_memory_kb" in local:
+        values["local_peak_memory_kb"] = local["peak_memory_kb"]
+    return values
+
+
+class ResultsTable:
+    """
+    Columnar view of the evaluation results of one dataset: one float array per (model, metric), with NaN
+    where a problem has no value, plus problem lengths and tags. Mutation records only mark rows as stale,
+    and refresh() re-reads just those rows, so the table stays cheap to keep current between analyses.
+    """
+
+    def __init__(self, dataset_type):
+        self.dataset_type = dataset_type
+        self.metrics = METRICS[dataset_type]
+        self.ids = []
+        self.rows = {}
+        self.lengths = np.empty(0)
+        self.tags = []
+        self.columns = {}
+        self.fingerprint = None
+        self._stale = set()
+
+    @classmethod
+    def build(cls, dataset_type, dataset):
+        table = cls(dataset_type)
+        table._stale = set(dataset)
+        table.refresh(dataset)
+        return table
+
+    @property
+    def models(self):
+        return sorted({model for model, _ in self.columns})
+
+    def apply_change(self, change):
+        self._stale.add(str(change["id"]))
+
+    def refresh(self, dataset):
+        """Re-read the rows of problems changed since the last refresh."""
+        if not self._stale:
+            return
+        removed = [problem_id for problem_id in self._stale if problem_id not in dataset and problem_id in self.rows]
+        if removed:
+            keep = np.ones(len(self.ids), dtype=bool)
+            keep[[self.rows[problem_id] for problem_id in removed]] = False
+            self.ids = [problem_id for problem_id, kept in zip(self.ids, keep) if kept]
+            self.tags = [tags for tags, kept in zip(self.tags, keep) if kept]
+            self.lengths = self.lengths[keep]
+            self.columns = {key: column[keep] for key, column in self.columns.items()}
+            self.rows = {problem_id: i for i, problem_id in enumerate(self.ids)}
+
+        added = sorted((problem_id for problem_id in self._stale if problem_id in dataset and problem_id not in self.rows),
+                       key=int)
+        if added:
+            self.rows.update({problem_id: len(self.ids) + i for i, problem_id in enumerate(added)})
+            self.ids.extend(added)
+            self.tags.extend([] for _ in added)
+            self.lengths = np.concatenate([self.lengths, np.zeros(len(added))])
+            self.columns = {key: np.concatenate([column, np.full(len(added), np.nan)])
+                            for key, column in self.columns.items()}
+
+        for problem_id in self._stale:
+            if problem_id not in dataset:
+                continue
+            row = self.rows[problem_id]
+            entry = dataset[problem_id]
+            self.lengths[row] = entry.text_length("problem") if hasattr(entry, "text_length") else len(entry.get("problem", ""))
+            self.tags[row] = list(entry.get("tags", []))
+            for column in self.columns.values():
+                column[row] = np.nan
+            for model in entry:
+                if model in ENTRY_FIELDS or not isinstance(entry[model], dict):
+                    continue
+                values = _metric_values(entry[model], self.metrics)
+                for metric in self.metrics:
+                    value = values.get(metric)
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        if (model, metric) not in self.columns:
+                            self.columns[(model, metric)] = np.full(len(self.ids), np.nan)
+                        self.columns[(model, metric)][row] = value
+        self._stale.clear()
+
+    def column(self, model, metric):
+        if metric not in self.metrics:
+            raise ValueError(f"Unknown metric '{metric}' for {self.dataset_type} dataset. Choose from {self.metrics}.")
+        return self.columns.get((model, metric), np.full(len(self.ids), np.nan))
+
+
+def summarize(table, models=None):
+    """Per-model count, mean, median, std, min and max of every metric, ignoring problems without a value."""
+    summary = {}
+    for model in models or table.models:
+        stats = {}
+        for metric in table.metrics:
+            values = table.column(model, metric)
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            stats[metric] = {
+                "count": int(len(values)),
+                "mean": float(values.mean()),
+                "median": float(np.median(values)),
+                "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                "min": float(values.min()),
+                "max": float(values.max()),
+            }
+        summary[model] = stats
+    return summary
+
+
+def summarize_generation(dataset, models=None):
+    """
+    Per-model latency and token usage of the stored solutions' generation calls: call count, mean and median
+    latency and time to first token, token totals, completion tokens per second and finish_reason counts.
+    """
+    calls = {}
+    for entry in dataset.values():
+        for model in entry:
+            if model in ENTRY_FIELDS or (models and model not in models) or not isinstance(entry[model], dict):
+                continue
+            generation = entry[model].get("generation")
+            if generation:
+                calls.setdefault(model, []).append(generation)
+
+    summary = {}
+    for model, generations in sorted(calls.items()):
+        columns = {field: np.array([g.get(field) if g.get(field) is not None else np.nan for g in generations],
+                                   dtype=float)
+                   for field in GENERATION_TIMINGS + GENERATION_TOKENS}
+        stats = {"calls": len(generations)}
+        for field in GENERATION_TIMINGS:
+            values = columns[field][~np.isnan(columns[field])]
+            if len(values):
+                stats[field] = {"mean": float(values.mean()), "median": float(np.median(values)),
+                                "max": float(values.max())}
+        for field in GENERATION_TOKENS:
+            values = columns[field][~np.isnan(columns[field])]
+            if len(values):
+                stats[field] = {"total": int(values.sum()), "mean": float(values.mean())}
+        timed = ~np.isnan(columns["completion_tokens"]) & (columns["latency_s"] > 0)
+        if timed.any():
+            stats["completion_tokens_per_s"] = float(columns["completion_tokens"][timed].sum()
+                                                     / columns["latency_s"][timed].sum())
+        finish_reasons = {}
+        for generation in generations:
+            reason = generation.get("finish_reason") or "unknown"
+            finish_reasons[reason] = finish_reasons.get(reason, 0) + 1
+        stats["finish_reasons"] = finish_reasons
+        summary[model] = stats
+    return summary
+
+
+def paired_comparison(a, b, lower_is_better=False, n_bootstrap=10000, confidence=0.95, seed=0):
+    """
+    Compare two models on the problems both have a value for. Differences are a - b; wins are counted in
+    the direction that is better for the metric. The mean difference gets a percentile bootstrap CI.
+    """
+    paired = ~np.isnan(a) & ~np.isnan(b)
+    a, b = a[paired], b[paired]
+    n = len(a)
+    if n == 0:
+        return {"n": 0}
+    diff = a - b
+    better = -diff if lower_is_better else diff
+    result = {
+        "n": int(n),
+        "mean_a": float(a.mean()),
+        "mean_b": float(b.mean()),
+        "median_a": float(np.median(a)),
+        "median_b": float(np.median(b)),
+        "mean_difference": float(diff.mean()),
+        "median_difference": float(np.median(diff)),
+        "win_rate_a": float((better > 0).mean()),
+        "win_rate_b": float((better < 0).mean()),
+        "tie_rate": float((better == 0).mean()),
+    }
+    if n_bootstrap:
+        rng = np.random.default_rng(seed)
+        samples = diff[rng.integers(0, n, size=(n_bootstrap, n))].mean(axis=1)
+        alpha = (1 - confidence) / 2
+        low, high = np.quantile(samples, [alpha, 1 - alpha])
+        result["mean_difference_ci"] = [float(low), float(high)]
+    return result
+
+
+def _groups(table, by, length_bins):
+    """Return {group_label: boolean row mask} for a breakdown by tag or problem length."""
+    if by == "tag":
+        labels = sorted({tag for tags in table.tags for tag in tags})
+        groups = {tag: np.array([tag in tags for tags in table.tags], dtype=bool) for tag in labels}
+        untagged = np.array([not tags for tags in table.tags], dtype=bool)
+        if untagged.any():
+            groups["untagged"] = untagged
+        return groups
+    if by == "length":
+        if not len(table.lengths):
+            return {}
+        edges = np.unique(np.quantile(table.lengths, np.linspace(0, 1, length_bins + 1)))
+        bins = np.clip(np.searchsorted(edges, table.lengths, side="right") - 1, 0, len(edges) - 2)
+        return {f"{int(edges[i])}-{int(edges[i + 1])} chars": bins == i for i in range(len(edges) - 1)}
+    raise ValueError("Invalid breakdown. Choose 'tag' or 'length'.")
+
+
+def compare_models(table, model_a, model_b, metric, by=None, length_bins=4, n_bootstrap=10000, confidence=0.95,
+                   seed=0):
+    """Paired comparison of two models on one metric, optionally broken down by tag or problem length."""
+    a, b = table.column(model_a, metric), table.column(model_b, metric)
+    lower_is_better = metric in LOWER_IS_BETTER
+    result = {
+        "metric": metric,
+        "models": [model_a, model_b],
+        "overall": paired_comparison(a, b, lower_is_better, n_bootstrap, confidence, seed),
+    }
+    if by:
+        result["by_" + by] = {
+            label: paired_comparison(a[mask], b[mask], lower_is_better, n_bootstrap, confidence, seed)
+            for label, mask in _groups(table, by, length_bins).items()
+        }
+    return result
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .solution_benchmark import benchmark_solution
+from .solution_extract import solution_hash
+
+
+def _available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _run_job(job, core, options):
+    """Worker entry point: pin to the assigned core, then benchmark (the sandboxed subprocess inherits the pinning)."""
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+    return benchmark_solution(job["code"], job["cases"], method=job.get("method"), annotations=job.get("annotations"),
+                              bytecode=job.get("bytecode"), **options)
+
+
+class BenchmarkScheduler:
+    """
+    Fans (problem_id, model) benchmark jobs out to a process pool with one job per core.
+    Each job is pinned to its own core to keep timing noise low and runs its solution under CPU and memory
+    rlimits. Results are appended to a JSON-lines file as they complete, so an interrupted sweep keeps its
+    progress and a re-run only schedules pairs whose solution has no stored result for the same cases and
+    repeat/number/timeout settings. Crashed pools are recreated and jobs that hang past their deadline have
+    their workers killed; such failures are returned but not stored, so the next run retries them.
+    """
+
+    def __init__(self, results_path, max_workers=None, repeat=5, number=10, timeout=30, cpu_seconds=None,
+                 memory_bytes=2 * 1024 ** 3, max_attempts=3):
+        self.results_path = results_path
+        self.cores = _available_cores()
+        self.max_workers = min(max_workers or len(self.cores), len(self.cores))
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.options = {"repeat": repeat, "number": number, "timeout": timeout, "cpu_seconds": cpu_seconds,
+                        "memory_bytes": memory_bytes}
+
+    def _settings_hash(self, cases):
+        """Identify the cases and measurement settings so that results are only reused when both match."""
+        settings = {"cases": cases, "repeat": self.options["repeat"], "number": self.options["number"],
+                    "timeout": self.options["timeout"]}
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+    def load_results(self):
+        """Return the stored results as {(problem_id, model_name, solution_hash, settings_hash): metrics}."""
+        results = {}
+        if not os.path.exists(self.results_path):
+            return results
+        with open(self.results_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted run
+                if "settings_hash" not in record:
+                    continue  # Stored before settings were recorded, so it cannot be matched
+                key = (record["problem_id"], record["model"], record["solution_hash"], record["settings_hash"])
+                results[key] = record["metrics"]
+        return results
+
+    def _append_result(self, job, metrics):
+        with open(self.results_path, 'a') as f:
+            f.write(json.dumps({"problem_id": job["problem_id"], "model": job["model"],
+                                "solution_hash": job["solution_hash"], "settings_hash": job["settings_hash"],
+                                "metrics": metrics}) + '\n')
+            f.flush()
+
+    def _new_pool(self):
+        # Workers can be reused: each solution already runs in its own solution_runner subprocess. Recycling
+        # workers (max_tasks_per_child) would force the spawn start method, which re-runs the caller's script.
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    @staticmethod
+    def _kill_pool(pool):
+        # ProcessPoolExecutor has no public way to stop a hung worker, so terminate its processes directly
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, jobs, resume=True):
+        """
+        Benchmark jobs, each a dict with problem_id, model, code and cases.
+        Returns {(problem_id, model): metrics} for every job, including results reused from earlier runs.
+        Infrastructure failures (crashed or hung workers, executor errors) are marked "transient": True.
+        """
+        if not resume and os.path.exists(self.results_path):
+            os.remove(self.results_path)
+        stored = self.load_results()
+
+        results = {}
+        pending = []
+        for job in jobs:
+            job = dict(job, solution_hash=solution_hash(job["code"]), settings_hash=self._settings_hash(job["cases"]))
+            key = (job["problem_id"], job["model"], job["solution_hash"], job["settings_hash"])
+            if key in stored:
+                results[(job["problem_id"], job["model"])] = stored[key]
+            else:
+                pending.append(job)
+        if results:
+            print(f"Reusing {len(results)} stored benchmark results; {len(pending)} jobs left to run.")
+
+        attempts = {}
+        free_cores = list(self.cores[:self.max_workers])
+        in_flight = {}
+        pool = self._new_pool()
+        try:
+            while pending or in_flight:
+                while pending and free_cores:
+                    job = pending.pop(0)
+                    core = free_cores.pop(0)
+                    future = pool.submit(_run_job, job, core, self.options)
+                    # Allow for process start-up on top of the sandbox timeout before treating the job as hung
+                    in_flight[future] = (job, core, time.monotonic() + 2 * self.timeout + 10)
+
+                done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job, core, _ = in_flight.pop(future)
+                    free_cores.append(core)
+                    try:
+                        metrics = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        self._retry_or_fail(job, attempts, pending, results, "Worker process crashed")
+                        continue
+                    except Exception as e:
+                        # Pickling or executor failures say nothing about the solution, so they are not stored
+                        results[(job["problem_id"], job["model"])] = {
+                            "status": "error", "passed": 0, "total": len(job["cases"]), "error": str(e),
+                            "transient": True}
+                        continue
+                    results[(job["problem_id"], job["model"])] = metrics
+                    self._append_result(job, metrics)
+
+                now = time.monotonic()
+                hung = [future for future, (_, _, deadline) in in_flight.items() if now > deadline]
+                if broken or hung:
+                    # Recycle the whole pool; jobs that were still running are rescheduled
+                    self._kill_pool(pool)
+                    for future, (job, core, _) in list(in_flight.items()):
+                        free_cores.append(core)
+                        reason = "Worker process hung" if future in hung else None
+                        if reason:
+                            self._retry_or_fail(job, attempts, pending, results, reason)
+                        else:
+                            pending.insert(0, job)
+                    in_flight.clear()
+                    pool = self._new_pool()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def _retry_or_fail(self, job, attempts, pending, results, reason):
+        key = (job["problem_id"], job["model"])
+        attempts[key] = attempts.get(key, 0) + 1
+        if attempts[key] < self.max_attempts:
+            pending.append(job)
+            return
+        # Returned for this run only; not stored, so a later run retries the job
+        results[key] = {"status": "error", "passed": 0, "total": len(job["cases"]), "error": reason, "transient": True}
@@ -1,40 +1,223 @@
 import json
 import os
 import random
-import requests
-import openai
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# openai, requests and the modules built on them are imported where they are used, so that dataset edits and
+# queries (e.g. through `python -m scripts`) start without loading the network libraries
+from .problem_index import MinHashIndex, ProblemIndex, problem_hash
+from .storage import JsonFileStorage, apply_change
+
+# The repository root, which holds math_problems.json and leetcode_problems.json
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_dataset_folder():
+    """The folder used when none is given: $PROBLEMSET_DATASET_FOLDER if set, otherwise the repository root."""
+    return os.environ.get("PROBLEMSET_DATASET_FOLDER") or REPO_FOLDER
+
 
 class DatasetManager:
-    def __init__(self, dataset_folder='../High-Level-GPT-vs-OpenAI-ProblemSet/'):
-        self.dataset_folder = dataset_folder
-        self.math_dataset_path = os.path.join(self.dataset_folder, 'math_problems.json')
-        self.leetcode_dataset_path = os.path.join(self.dataset_folder, 'leetcode_problems.json')
+    def __init__(self, dataset_folder=None, in_memory=False, storage=None, llm_cache=None, registry=None):
+        """
+        dataset_folder defaults to default_dataset_folder(), so the manager finds the datasets regardless of the
+        current working directory.
+        When in_memory is True, each dataset is loaded once and kept in memory. Changes are only written
+        to disk by flush() (or when leaving a `with DatasetManager(...)` block) instead of on every call.
+        storage selects how datasets are persisted (see scripts/storage.py); it defaults to JsonFileStorage,
+        and JournalStorage appends each change to a journal instead of rewriting the dataset file.
+        llm_cache is an optional LLMCache (see scripts/llm_cache.py) that serves repeated model requests locally.
+        registry maps model names to providers, pooled clients and rate limits (see scripts/model_registry.py);
+        it defaults to default_registry().
+        """
+        self.dataset_folder = dataset_folder or default_dataset_folder()
+        self.in_memory = in_memory
+        self.storage = storage if storage is not None else JsonFileStorage(self.dataset_folder)
+        # In-memory datasets and the changes not yet flushed to storage, keyed by dataset_type
+        self._datasets = {}
+        self._pending = {}
+        # Duplicate-detection indexes, keyed by dataset_type (see scripts/problem_index.py)
+        self._indexes = {}
+        self._unsaved_indexes = set()
+        self._minhash_indexes = {}
+        # Columnar evaluation results used by summary()/compare(), keyed by dataset_type
+        self._results_tables = {}
+        self.math_dataset_path = self.storage.dataset_path("math")
+        self.leetcode_dataset_path = self.storage.dataset_path("leetcode")
         self.titleslug_store_path = os.path.join(self.dataset_folder, 'queried_titleslugs.json')
+        # Model routing, long-lived clients and per-provider rate limits; created on first use (see registry)
+        self._registry = registry
+        self._registry_lock = threading.Lock()
+        self.llm_cache = llm_cache
+        # Compiled LeetCode solutions, keyed by solution hash; created on first use (see code_cache)
+        self._code_cache = None
         # Initialize datasets and titleslug store if they don't exist
-        self._initialize_dataset(self.math_dataset_path)
-        self._initialize_dataset(self.leetcode_dataset_path)
+        self._initialize_dataset("math")
+        self._initialize_dataset("leetcode")
         # self._initialize_dataset(self.titleslug_store_path)
+
+    @property
+    def registry(self):
+        """The ModelRegistry used to reach models, created on first use so that openai is only imported when needed."""
+        if self._registry is None:
+            # prompt_llm_batch reaches this from several threads, which must share one registry and its providers
+            with self._registry_lock:
+                if self._registry is None:
+                    from .model_registry import default_registry
+
+                    self._registry = default_registry()
+        return self._registry
+
+    @property
+    def code_cache(self):
+        """The CodeCache of compiled LeetCode solutions (see scripts/solution_extract.py), kept under .cache/compiled."""
+        if self._code_cache is None:
+            from .solution_extract import CodeCache
+
+            self._code_cache = CodeCache(os.path.join(self.dataset_folder, '.cache', 'compiled'))
+        return self._code_cache
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+        return False
     
-    def _initialize_dataset(self, path):
+    def _initialize_dataset(self, dataset_type):
         """If the dataset file does not exist, create it with an empty structure."""
         try:
-            if not os.path.exists(path):
-                with open(path, 'w') as f:
-                    json.dump({}, f, indent=4)
+            self.storage.initialize(dataset_type)
         except Exception as e:
-            print(f"Error initializing dataset at {path}: {e}")
+            print(f"Error initializing {dataset_type} dataset: {e}")
     
-    def _is_duplicate(self, problem_str, dataset):
-        """Check if the problem already exists in the dataset."""
-        return any(problem_data["problem"] == problem_str for problem_data in dataset.values())
+    def _get_dataset_path(self, dataset_type):
+        """Return the file path of the specified dataset (either 'math' or 'leetcode')."""
+        return self.storage.dataset_path(dataset_type)
+
+    def _load_dataset(self, dataset_type):
+        """Load the specified dataset, reusing the in-memory copy when running in in_memory mode."""
+        if self.in_memory and dataset_type in self._datasets:
+            return self._datasets[dataset_type]
+        dataset = self.storage.load(dataset_type)
+        if self.in_memory:
+            self._datasets[dataset_type] = dataset
+            self._pending[dataset_type] = []
+        return dataset
+
+    def _save_dataset(self, dataset_type, dataset, changes):
+        """
+        Apply the mutation records (see storage.apply_change) to the dataset and persist them, together with
+        the updated index. In in_memory mode they are only queued until flush(). Nothing is written without changes.
+        """
+        if not changes:
+            return
+        for change in changes:
+            apply_change(dataset, change)
+        if self.in_memory:
+            self._datasets[dataset_type] = dataset
+            self._pending.setdefault(dataset_type, []).extend(changes)
+        else:
+            self.storage.save(dataset_type, dataset, changes)
+        self._update_indexes(dataset_type, changes)
+        if not self.in_memory and dataset_type in self._unsaved_indexes:
+            self._save_index(dataset_type)
+
+    def dirty_problems(self, dataset_type):
+        """Return the IDs of problems changed in memory but not yet flushed to disk."""
+        return {str(change["id"]) for change in self._pending.get(dataset_type, ())}
+
+    def flush(self):
+        """Write every in-memory dataset with pending changes to storage in a single save per dataset."""
+        for dataset_type, changes in self._pending.items():
+            if changes:
+                self.storage.save(dataset_type, self._datasets[dataset_type], changes)
+                changes.clear()
+                self._update_indexes(dataset_type, [])
+        for dataset_type in list(self._unsaved_indexes):
+            self._save_index(dataset_type)
+
+    def compact(self):
+        """Flush pending changes and fold any storage journal back into the dataset JSON files."""
+        self.flush()
+        for dataset_type in ("math", "leetcode"):
+            self.storage.compact(dataset_type)
+            if dataset_type in self._indexes:
+                self._update_indexes(dataset_type, [])
+                self._save_index(dataset_type)
+
+    def _index_is_current(self, index, dataset_type):
+        """An index is current if it was synced with the storage files as they are now."""
+        return index is not None and (self.in_memory or index.fingerprint == self.storage.fingerprint(dataset_type))
+
+    def _get_index(self, dataset_type, dataset):
+        """Return the hash/title_slug index of the dataset, loading the persisted copy or rebuilding it if missing or stale."""
+        index = self._indexes.get(dataset_type)
+        if self._index_is_current(index, dataset_type):
+            return index
+        fingerprint = self.storage.fingerprint(dataset_type)
+        index = None
+        if not self._pending.get(dataset_type):
+            index = ProblemIndex.load(self.storage.index_path(dataset_type))
+        if index is None or index.fingerprint != fingerprint or not index.matches(dataset):
+            index = ProblemIndex.build(dataset)
+            index.fingerprint = fingerprint
+            self._indexes[dataset_type] = index
+            if not self._pending.get(dataset_type):
+                self._save_index(dataset_type)
+        self._indexes[dataset_type] = index
+        return index
+
+    def _get_minhash_index(self, dataset_type, dataset):
+        """Return the near-duplicate index of the dataset, building it if missing or stale."""
+        index = self._minhash_indexes.get(dataset_type)
+        if self._index_is_current(index, dataset_type):
+            return index
+        index = MinHashIndex()
+        for problem_id, problem_data in dataset.items():
+            index.add(problem_id, problem_data["problem"])
+        index.fingerprint = self.storage.fingerprint(dataset_type)
+        self._minhash_indexes[dataset_type] = index
+        return index
+
+    def _update_indexes(self, dataset_type, changes):
+        """Apply mutation records to any built indexes and re-tag them with the current storage fingerprint."""
+        fingerprint = self.storage.fingerprint(dataset_type)
+        for indexes in (self._indexes, self._minhash_indexes, self._results_tables):
+            index = indexes.get(dataset_type)
+            if index is None:
+                continue
+            for change in changes:
+                index.apply_change(change)
+            index.fingerprint = fingerprint
+        if changes and dataset_type in self._indexes:
+            self._unsaved_indexes.add(dataset_type)
+
+    def _save_index(self, dataset_type):
+        """Persist the hash/title_slug index next to the dataset."""
+        try:
+            self._indexes[dataset_type].save(self.storage.index_path(dataset_type), self.storage.fingerprint(dataset_type))
+        except Exception as e:
+            print(f"Error saving {dataset_type} index: {e}")
+        self._unsaved_indexes.discard(dataset_type)
+
+    def _is_duplicate(self, problem_str, dataset_type, dataset):
+        """Check if the problem (ignoring whitespace and case) already exists in the dataset."""
+        return self._get_index(dataset_type, dataset).find(problem_str) is not None
 
     
-    def _get_next_id(self, dataset):
+    def _get_next_id(self, dataset_type, dataset):
         """Generate the next ID based on the highest current ID."""
-        if len(dataset) == 0:
-            return 1
-        return max(map(int, dataset.keys())) + 1
+        return self._get_index(dataset_type, dataset).max_id + 1
+
+    def find_near_duplicates(self, problem_str, dataset_type="math", threshold=0.8):
+        """
+        Find problems whose statements are likely rewordings of problem_str, using MinHash over word shingles.
+        Returns a list of (problem_id, estimated_similarity) pairs, most similar first.
+        """
+        dataset = self._load_dataset(dataset_type)
+        return self._get_minhash_index(dataset_type, dataset).query(problem_str, threshold)
 
 
     def _is_duplicate_slug(self, title_slug):
@@ -58,33 +241,34 @@ class DatasetManager:
         except Exception as e:
             print(f"Error saving title slug: {e}")
     
-    def add_problem(self, problem_str, dataset_type="math", title_slug=None):
+    def add_problem(self, problem_str, dataset_type="math", title_slug=None, near_duplicate_threshold=None):
         """Add a new problem to the specified dataset (either 'math' or 'leetcode').
         If title_slug is provided, save it only if the problem is added successfully.
+        If near_duplicate_threshold is set, also reject problems that look like rewordings of an existing one.
+        Returns the new problem ID, or None if the problem was not added.
         """
         if not problem_str.strip():
             print("Problem string is empty. Cannot add an empty problem.")
             return
         
-        if dataset_type == "math":
-            dataset_path = self.math_dataset_path
-        elif dataset_type == "leetcode":
-            dataset_path = self.leetcode_dataset_path
-        else:
-            raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
+        self._get_dataset_path(dataset_type)  # Raises ValueError for an invalid dataset_type
         
         try:
             # Load the dataset
-            with open(dataset_path, 'r') as f:
-                dataset = json.load(f)
+            dataset = self._load_dataset(dataset_type)
 
             # Check for duplicate problems
-            if self._is_duplicate(problem_str, dataset):
+            if self._is_duplicate(problem_str, dataset_type, dataset):
                 print(f"Problem already exists in {dataset_type} dataset.")
                 return
+            if near_duplicate_threshold is not None:
+                near_duplicates = self._get_minhash_index(dataset_type, dataset).query(problem_str, near_duplicate_threshold)
+                if near_duplicates:
+                    print(f"Problem is a near duplicate of problem ID {near_duplicates[0][0]} in {dataset_type} dataset.")
+                    return
             
             # Generate the new problem with an auto-incremented ID
-            new_problem_id = str(self._get_next_id(dataset))
+            new_problem_id = str(self._get_next_id(dataset_type, dataset))
             if title_slug:
                 new_problem_data = {
                     "title_slug": title_slug,
@@ -92,13 +276,10 @@ class DatasetManager:
                 }
             else:
                 new_problem_data = {"problem": problem_str}
-            # Add the new problem to the dataset using the new ID as the key
-            dataset[new_problem_id] = new_problem_data
-            
-            # Save the updated dataset
-            with open(dataset_path, 'w') as f:
-                json.dump(dataset, f, indent=4)
+            # Add the new problem to the dataset using the new ID as the key and save it
+            self._save_dataset(dataset_type, dataset, [{"op": "add_problem", "id": new_problem_id, "data": new_problem_data}])
             print(f"New problem added to {dataset_type} dataset with ID {new_problem_id}.")
+            return new_problem_id
             
             # Save the titleSlug only if the problem was added
             # if title_slug:
@@ -107,115 +288,119 @@ class DatasetManager:
         except Exception as e:
             print(f"Error adding problem to {dataset_type} dataset: {e}")
 
-    def query_leetcode_problems(self, tag, limit_num=100):
-        """Query LeetCode API to get a list of Hard questions for a given tag, select random titleslugs, and avoid duplicates."""
-        URL_prob_list = f"https://alfa-leetcode-api.onrender.com/problems?tags={tag}&limit={limit_num}"
+    def add_problems(self, problems, dataset_type="math"):
+        """
+        Add several problems to the specified dataset in a single save. Each problem is a dict with at least a
+        "problem" key (and optionally "title_slug" or other metadata). Empty and duplicate problems are skipped.
+        Returns the IDs of the problems that were added.
+        """
+        self._get_dataset_path(dataset_type)  # Raises ValueError for an invalid dataset_type
         
         try:
-            r = requests.get(URL_prob_list)
-            data = r.json()
-            hard_questions = [q for q in data['problemsetQuestionList'] if q['difficulty'] == 'Hard']
-            hard_question_titleslugs = [q['titleSlug'] for q in hard_questions]
-            
-            # Randomly select titleslugs and avoid duplicates
-            random.shuffle(hard_question_titleslugs)
-            
-            # Get the initial count of problems in the dataset
-            with open(self.leetcode_dataset_path, 'r') as f:
-                initial_problem_count = len(json.load(f))
-            print(f"Initial number of problems in dataset: {initial_problem_count}")
-            
-            problems_added = 0
-            attempts = 0
-            
-            while problems_added < 15 and attempts < len(hard_question_titleslugs):
-                slug = hard_question_titleslugs[attempts]
-                attempts += 1
-
-                # Check if the title_slug is already present in the dataset
-                with open(self.leetcode_dataset_path, 'r') as f:
-                    dataset = json.load(f)
-                if slug in [entry["title_slug"] for entry in dataset.values()]:
-                    continue  # Skip if duplicate title_slug found
-                
-                # if not self._is_duplicate_slug(slug):
-                try:
-                    # Try fetching and adding the problem
-                    self.get_problem_description_and_add(slug)
-                    
-                    # Check if the problem was actually added
-                    with open(self.leetcode_dataset_path, 'r') as f:
-                        current_problem_count = len(json.load(f))
-                    
-                    if current_problem_count > initial_problem_count + problems_added:
-                        problems_added += 1
-                        print(f"Added problem {problems_added}/15")
-                    else:
-                        # print(f"Problem for {slug} was not added (likely duplicate content)")
-                        pass
-                except Exception as e:
-                    # print(f"Error fetching problem for titleSlug {slug}: {e}")
-                    pass
-                
-                if problems_added >= 15:
-                    break
-            
-            # Get the final count of problems in the dataset
-            # with open(self.leetcode_dataset_path, 'r') as f:
-            #     final_problem_count = len(json.load(f))
-            
-            # print(f"Final number of problems in dataset: {final_problem_count}")
-            # print(f"Total problems added in this run: {final_problem_count - initial_problem_count}")
-            
-            if problems_added < 15:
-                print(f"Warning: Only able to add {problems_added} problems. Consider increasing the limit_num or adding more tags.")
-        
+            dataset = self._load_dataset(dataset_type)
+            index = self._get_index(dataset_type, dataset)
+            changes = []
+            queued_hashes = set()
+            next_id = index.max_id + 1
+            for new_problem_data in problems:
+                problem_str = new_problem_data.get("problem", "")
+                text_hash = problem_hash(problem_str)
+                # Skip problems already in the dataset or repeated earlier in this batch
+                if not problem_str.strip() or text_hash in index.hashes or text_hash in queued_hashes:
+                    continue
+                queued_hashes.add(text_hash)
+                changes.append({"op": "add_problem", "id": str(next_id), "data": new_problem_data})
+                next_id += 1
+            self._save_dataset(dataset_type, dataset, changes)
+            new_ids = [change["id"] for change in changes]
+            print(f"Added {len(new_ids)} new problems to {dataset_type} dataset.")
+            return new_ids
+        except Exception as e:
+            print(f"Error adding problems to {dataset_type} dataset: {e}")
+            return []
+
+    def query_leetcode_problems(self, tag, limit_num=100, max_new=15, cache_dir=None, api_url=None, max_workers=8):
+        """
+        Query LeetCode API to get a list of Hard questions for one or more tags, select random titleslugs, and avoid duplicates.
+        Descriptions are fetched concurrently and cached by titleSlug in cache_dir; api_url can point to a
+        LeetCodeFixtureServer for offline runs. See scripts/leetcode_ingest.py.
+        """
+        from .leetcode_ingest import DEFAULT_API_URL, LeetCodeIngestor
+
+        ingestor = LeetCodeIngestor(self, api_url=api_url or DEFAULT_API_URL, cache_dir=cache_dir, max_workers=max_workers)
+        try:
+            print(f"Initial number of problems in dataset: {len(self._load_dataset('leetcode'))}")
+            return ingestor.ingest(tag, limit_num=limit_num, max_new=max_new)
         except Exception as e:
             print(f"Error querying LeetCode API: {e}")
+            return []
 
-    def get_problem_description_and_add(self, title_slug):
-        """Fetch the problem description using the titleSlug and add it to the dataset."""
-        URL_single = f"https://alfa-leetcode-api.onrender.com/select?titleSlug={title_slug}"
-        
+    def backfill_leetcode_tags(self, problem_ids=None, overwrite=False, cache_dir=None, api_url=None, max_workers=8):
+        """
+        Fetch the LeetCode topic tags of stored problems by title_slug and save them under "tags", which
+        compare(by="tag") groups by. Problems imported before tags were recorded have none. Returns the updated IDs.
+        """
+        from .leetcode_ingest import DEFAULT_API_URL, LeetCodeIngestor
+
+        ingestor = LeetCodeIngestor(self, api_url=api_url or DEFAULT_API_URL, cache_dir=cache_dir, max_workers=max_workers)
         try:
-            r = requests.get(URL_single)
-            problem_data = r.json()
-            problem_description = problem_data["question"] + problem_data['exampleTestcases']
-            
-            if problem_description:
-                self.add_problem(problem_description, dataset_type="leetcode", title_slug=title_slug)
-            else:
-                print(f"No description found for titleSlug {title_slug}.")
-        
+            updated = ingestor.backfill_tags(problem_ids, overwrite=overwrite)
+        except Exception as e:
+            print(f"Error querying LeetCode API: {e}")
+            return []
+        print(f"Stored tags for {len(updated)} problems.")
+        return updated
+
+    def get_problem_description_and_add(self, title_slug, cache_dir=None, api_url=None):
+        """
+        Fetch the problem description using the titleSlug and add it to the dataset, with its topic tags.
+        The request goes through LeetCodeIngestor's pooled session with timeouts and retries. Returns the new ID or None.
+        """
+        from .leetcode_ingest import DEFAULT_API_URL, LeetCodeIngestor
+
+        dataset = self._load_dataset("leetcode")
+        if self._get_index("leetcode", dataset).find_slug(title_slug) is not None:
+            print(f"Problem with titleSlug {title_slug} already exists in leetcode dataset.")
+            return None
+        try:
+            problem_data = LeetCodeIngestor(self, api_url=api_url or DEFAULT_API_URL, cache_dir=cache_dir).fetch_problem(title_slug)
         except Exception as e:
             print(f"Error fetching problem for titleSlug {title_slug}: {e}")
-    
+            return None
+
+        problem_description = (problem_data.get("question") or "") + (problem_data.get("exampleTestcases") or "")
+        if not problem_description:
+            print(f"No description found for titleSlug {title_slug}.")
+            return None
+        new_problem_data = {"title_slug": title_slug, "problem": problem_description}
+        topic_tags = [t["slug"] for t in problem_data.get("topicTags") or [] if t.get("slug")]
+        if topic_tags:
+            new_problem_data["tags"] = topic_tags
+        new_ids = self.add_problems([new_problem_data], dataset_type="leetcode")
+        return new_ids[0] if new_ids else None
+
     def remove_problem(self, problem_id, dataset_type="math"):
-        """Remove a problem by its ID from the specified dataset (either 'math' or 'leetcode')."""
-        if dataset_type == "math":
-            dataset_path = self.math_dataset_path
-        elif dataset_type == "leetcode":
-            dataset_path = self.leetcode_dataset_path
-        else:
-            raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
+        """Remove a problem by its ID from the specified dataset (either 'math' or 'leetcode'). Returns whether it was removed."""
+        self._get_dataset_path(dataset_type)  # Raises ValueError for an invalid dataset_type
         
         try:
             # Load the dataset
-            with open(dataset_path, 'r') as f:
-                dataset = json.load(f)
+            dataset = self._load_dataset(dataset_type)
             
-            del dataset[str(problem_id)]
+            if str(problem_id) not in dataset:
+                raise KeyError(str(problem_id))
             
-            # Save the updated dataset
-            with open(dataset_path, 'w') as f:
-                json.dump(dataset, f, indent=4)
+            # Remove the problem and save the updated dataset
+            self._save_dataset(dataset_type, dataset, [{"op": "remove_problem", "id": str(problem_id)}])
             print(f"Problem with ID {problem_id} removed from {dataset_type} dataset.")
+            return True
         except Exception as e:
             print(f"Error removing problem from {dataset_type} dataset: {e}")
+            return False
     
-    def prompt_llm(self, openai_key, problem_id, model_name = "gpt-4o", dataset_type = "math"):
+    def _get_prompt_context(self, dataset_type):
+        """Return the system context used to prompt models for the given dataset type."""
         if dataset_type == "math":
-            dataset_path = self.math_dataset_path
             context = """You are an expert statistician and mathematician with extensive knowledge in advanced statistical methods, probability theory, and mathematical proofs. Your task is to solve PhD Qualifier and Graduate Level Statistics problems, providing a comprehensive, step-by-step solution. Focus on the following aspects:
 
 1. Detailed Steps: Show all work, including intermediate calculations, algebraic manipulations, and reasoning behind each step.
@@ -234,7 +419,6 @@ Please adhere to these guidelines:
 
 Your solution should be comprehensive enough for a professor to award full marks in a PhD qualifier or graduate-level exam setting."""
         elif dataset_type == "leetcode":
-            dataset_path = self.leetcode_dataset_path
             context = """You are an expert algorithm designer and Python programmer. Your task is to solve a LeetCode hard problem, optimizing for the following criteria in order of importance:
 
 1. Correctness: The solution must be correct and pass all test cases.
@@ -260,10 +444,188 @@ Please follow these guidelines:
 Your code will be directly submitted to the LeetCode judge, so it must be complete and runnable without any modifications."""
         else:
             raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
+        return context
+
+    def _resolve_model(self, model_name, api_key=None, base_url=None):
+        """Return the (ModelConfig, Provider, client) used to reach the given model name (see scripts/model_registry.py)."""
+        config, provider = self.registry.resolve(model_name, base_url)
+        return config, provider, provider.client(api_key)
+
+    def _partial_path(self, dataset_type, problem_id, model_name):
+        """Return the file a streamed response is written to while it is being generated."""
+        file_name = f"{dataset_type}-{problem_id}-{model_name.replace('/', '_')}.txt"
+        return os.path.join(self.dataset_folder, '.partial', file_name)
+
+    def _create_completion(self, client, request, stream=False, partial_path=None, on_token=None):
+        """
+        Send one chat completion request. Returns (content, finish_reason, usage, time_to_first_token).
+        When streaming, tokens are appended to partial_path as they arrive (so an interrupted response is kept
+        on disk) and passed to on_token; time_to_first_token is None for non-streamed requests.
+        """
+        start = time.perf_counter()
+        if not stream:
+            response = client.chat.completions.create(**request)
+            return response.choices[0].message.content, response.choices[0].finish_reason, response.usage, None
+
+        parts = []
+        finish_reason = usage = first_token = None
+        partial_file = None
+        if partial_path:
+            os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+            partial_file = open(partial_path, 'w', encoding='utf-8')
+        try:
+            for chunk in client.chat.completions.create(stream=True, stream_options={"include_usage": True},
+                                                        **request):
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                token = choice.delta.content if choice.delta else None
+                if not token:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(token)
+                if partial_file:
+                    partial_file.write(token)
+                    partial_file.flush()
+                if on_token:
+                    on_token(token)
+        finally:
+            if partial_file:
+                partial_file.close()
+        return ''.join(parts), finish_reason, usage, first_token
+
+    def _request_solution(self, client, selected_model, context, problem_str, max_retries=5, backoff=1.0,
+                          max_tokens=16000, temperature=0, use_cache=True, stream=False, partial_path=None,
+                          on_token=None, provider=None):
+        """
+        Request a solution from the model, retrying rate limited or transient failures with exponential backoff.
+        Responses are served from and stored in self.llm_cache unless use_cache is False.
+        When a provider is given, each attempt waits for its request and token budget first; the token
+        reservation (a rough prompt estimate plus max_tokens) is settled against the reported usage afterwards.
+        Returns (content, generation): the raw response (see _solution_data) and a record of the call's latency,
+        token usage and finish_reason, which is None when the response came from the cache.
+        """
+        import openai
+
+        cache_key = None
+        if self.llm_cache is not None and use_cache:
+            cache_key = self.llm_cache.make_key(selected_model, str(client.base_url), context, problem_str,
+                                                max_tokens, temperature)
+            content = self.llm_cache.get(cache_key)
+            if content is not None:
+                return content, None
+
+        request = {
+            "model": selected_model,
+            "messages": [
+                {
+                "role": "system",
+                "content": context
+                },
+                {
+                "role": "user",
+                "content": problem_str
+                }
+            ],
+            "max_tokens": max_tokens,  # Adjust as needed to ensure enough space for longer solutions
+        }
+        if temperature is not None:
+            request["temperature"] = temperature  # 0 ensures deterministic output
+        # Roughly 4 characters per prompt token
+        reserved_tokens = (len(context) + len(problem_str)) // 4 + max_tokens
+        queued = 0.0
+        for attempt in range(max_retries + 1):
+            if provider is not None:
+                queued += provider.acquire(reserved_tokens)
+            try:
+                start = time.perf_counter()
+                content, finish_reason, usage, time_to_first_token = self._create_completion(
+                    client, request, stream, partial_path, on_token)
+                latency = time.perf_counter() - start
+                break
+            except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+                if provider is not None:
+                    provider.record_usage(reserved_tokens, 0)
+                if attempt == max_retries:
+                    if stream and partial_path:
+                        print(f"Partial response from {selected_model} kept in {partial_path}")
+                    raise
+                delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+                # Honour the server's Retry-After hint when one is provided
+                retry_after = getattr(getattr(e, "response", None), "headers", {}).get("retry-after")
+                if retry_after:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+                if provider is not None and isinstance(e, openai.RateLimitError):
+                    # Hold back the other requests to this provider too instead of letting them all hit the limit
+                    provider.pause(delay)
+                print(f"Request to {selected_model} failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+        if provider is not None:
+            provider.record_usage(reserved_tokens, getattr(usage, "total_tokens", None))
+        details = getattr(usage, "completion_tokens_details", None)
+        generation = {
+            "model": selected_model,
+            "streamed": stream,
+            "attempts": attempt + 1,
+            "queued_s": queued,
+            "time_to_first_token_s": time_to_first_token,
+            "latency_s": latency,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+            "reasoning_tokens": getattr(details, "reasoning_tokens", None),
+            "total_tokens": getattr(usage, "total_tokens", None),
+            "finish_reason": finish_reason,
+        }
+        if stream and partial_path and os.path.exists(partial_path):
+            os.remove(partial_path)
+        # Responses cut off by max_tokens or a content filter are not cached, so a later call asks the model again
+        if cache_key is not None and content and finish_reason == "stop":
+            self.llm_cache.put(cache_key, content, model=selected_model)
+        return content or '', generation
+
+    def _solution_data(self, dataset_type, content, generation=None):
+        """
+        Turn a raw model response into the stored solution entry. LeetCode responses go through the extraction
+        stage (see scripts/solution_extract.py), which keeps only the `class Solution` code and records its entry
+        point under "solution_meta"; responses without a parseable `class Solution` (e.g. SQL answers) are kept
+        as they are. Math responses only have their code fences removed.
+        """
+        if dataset_type == "leetcode":
+            from .solution_extract import normalize_solution, solution_hash
+
+            solution, meta = normalize_solution(content)
+            if meta["valid"]:
+                self.code_cache.bytecode(solution)
+            else:
+                solution = content
+                meta["solution_hash"] = solution_hash(content)
+            data = {"solution": solution, "solution_meta": meta}
+        else:
+            data = {"solution": content.replace('```python\n', '').replace('\n```', '')}
+        if generation:
+            data["generation"] = generation
+        return data
+
+    def prompt_llm(self, openai_key, problem_id, model_name = "gpt-4o", dataset_type = "math", base_url=None, use_cache=True,
+                   stream=False):
+        """
+        Generate and store a solution for one problem. With stream=True the solution is printed as it is
+        generated and written to a partial-result file under dataset_folder/.partial until it completes.
+        The call's latency, token usage and finish_reason are stored next to the solution under "generation".
+        Returns the stored solution, or None if the problem was not found.
+        """
+        context = self._get_prompt_context(dataset_type)
         
         # Load the problem description from the dataset
-        with open(dataset_path, 'r') as f:
-            dataset = json.load(f)
+        dataset = self._load_dataset(dataset_type)
 
         # Check if the problem ID exists
         if str(problem_id) not in dataset:
@@ -278,61 +640,247 @@ Your code will be directly submitted to the LeetCode judge, so it must be comple
         
         problem_str = dataset[str(problem_id)]["problem"]
         
-        if model_name == "o1-preview":
-            client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=openai_key)
-        else:
-            client = OpenAI(api_key=openai_key)
-            
-        # Select the appropriate model based on the input
-        selected_model = f"openai/{model_name}" if model_name == "o1-preview" else model_name
-        
-        response = client.chat.completions.create(
-            model= selected_model,
-            messages=[
-                {
-                "role": "system",
-                "content": context
-                },
-                {
-                "role": "user",
-                "content": problem_str
-                }
-            ],
-            max_tokens=16000,  # Adjust as needed to ensure enough space for longer solutions
-            temperature=0  # Ensures deterministic output
+        config, provider, client = self._resolve_model(model_name, openai_key, base_url)
+        if stream:
+            print(f"\n{model_name} solution for problem ID {problem_id}:")
+            print("-" * 50)
+        content, generation = self._request_solution(
+            client, config.model_id, context, problem_str, max_tokens=config.max_tokens,
+            temperature=config.temperature, use_cache=use_cache, stream=stream,
+            partial_path=self._partial_path(dataset_type, problem_id, model_name),
+            on_token=lambda token: print(token, end="", flush=True), provider=provider
         )
-            # Store the solution in the GPT-4o slot
-        solution = response.choices[0].message.content.replace('```python\n', '').replace('\n```', '')
-        dataset[str(problem_id)][model_name] = {"solution": solution}
+        data = self._solution_data(dataset_type, content, generation)
+        solution = data["solution"]
         
         # Save the updated dataset with the new solution
-        with open(dataset_path, 'w') as f:
-            json.dump(dataset, f, indent=4)
+        self._save_dataset(dataset_type, dataset, [{"op": "store_solution", "id": str(problem_id), "model": model_name,
+                                                    "data": data}])
         
+        if stream:
+            if generation is None:
+                # Served from llm_cache, so no tokens were streamed
+                print(solution, end="")
+            print("\n" + "-" * 50)
         if dataset_type == "leetcode":
             print(f'Problem title: {dataset[str(problem_id)]["title_slug"]}')
         print(f"\nSolution added to {model_name} for problem ID {problem_id} to {dataset_type} dataset.")
-        print(f"\n{model_name} solution for problem ID {problem_id}:")
-        print("-" * 50)
-        print(solution)
-        print("-" * 50)
+        if generation:
+            print(f"Latency: {generation['latency_s']:.1f}s, prompt tokens: {generation['prompt_tokens']}, "
+                  f"completion tokens: {generation['completion_tokens']}, finish reason: {generation['finish_reason']}")
+        if not stream:
+            print(f"\n{model_name} solution for problem ID {problem_id}:")
+            print("-" * 50)
+            print(solution)
+            print("-" * 50)
+        return solution
+
+    def prompt_llm_batch(self, openai_key, problem_ids, models=("gpt-4o",), dataset_type="math", max_concurrency=4,
+                         max_retries=5, base_url=None, use_cache=True, stream=False):
+        """
+        Generate solutions for many problems and models concurrently.
+        openai_key may be a single key or a dict mapping model names to keys (e.g. an OpenRouter key for o1-preview).
+        All solutions are written to the dataset in a single save once every request has finished, each with the
+        latency and token usage of its call under "generation".
+        Returns a dict mapping (problem_id, model_name) to the generated solution.
+        Set use_cache=False to bypass the manager's llm_cache and always query the models, and stream=True to
+        stream responses into partial-result files under dataset_folder/.partial.
+        """
+        context = self._get_prompt_context(dataset_type)
+        dataset = self._load_dataset(dataset_type)
+
+        jobs = []
+        for problem_id in problem_ids:
+            if str(problem_id) not in dataset:
+                print(f"Problem with ID {problem_id} not found in the {dataset_type} dataset.")
+                continue
+            for model_name in models:
+                jobs.append((str(problem_id), model_name))
+
+        def run(job):
+            problem_id, model_name = job
+            api_key = openai_key.get(model_name) if isinstance(openai_key, dict) else openai_key
+            config, provider, client = self._resolve_model(model_name, api_key, base_url)
+            return self._request_solution(client, config.model_id, context, dataset[problem_id]["problem"],
+                                          max_retries=max_retries, max_tokens=config.max_tokens,
+                                          temperature=config.temperature, use_cache=use_cache, stream=stream,
+                                          partial_path=self._partial_path(dataset_type, problem_id, model_name),
+                                          provider=provider)
+
+        results = {}
+        records = []
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {executor.submit(run, job): job for job in jobs}
+            for future in as_completed(futures):
+                problem_id, model_name = futures[future]
+                try:
+                    content, generation = future.result()
+                except Exception as e:
+                    print(f"Error generating {model_name} solution for problem ID {problem_id}: {e}")
+                    continue
+                data = self._solution_data(dataset_type, content, generation)
+                results[(problem_id, model_name)] = data["solution"]
+                records.append({"op": "store_solution", "id": problem_id, "model": model_name, "data": data})
+
+        # Save every new solution in one write
+        if records:
+            self._save_dataset(dataset_type, dataset, records)
+
+        print(f"Generated {len(results)}/{len(jobs)} solutions for the {dataset_type} dataset.")
+        return results
+
+    def benchmark_solutions(self, problem_ids=None, models=("gpt-4o", "o1-preview"), repeat=5, number=10, timeout=30,
+                            max_workers=None, results_path=None, resume=True):
+        """
+        Benchmark stored LeetCode solutions locally instead of submitting them by hand.
+        The example test cases are parsed from each problem statement once and every model runs on the same
+        inputs in a sandboxed subprocess (see scripts/solution_benchmark.py). Jobs are spread over a process
+        pool with one job per core and streamed to results_path, so an interrupted sweep resumes where it
+        stopped (see scripts/benchmark_scheduler.py). Results are stored under "local_benchmark" next to each
+        model's other metrics in a single save, and returned as {(problem_id, model_name): metrics}.
+        """
+        from .benchmark_scheduler import BenchmarkScheduler
+        from .solution_benchmark import parse_examples
+        from .solution_extract import solution_hash
+
+        dataset = self._load_dataset("leetcode")
+        if problem_ids is None:
+            problem_ids = list(dataset.keys())
+
+        jobs = []
+        for problem_id in map(str, problem_ids):
+            if problem_id not in dataset:
+                print(f"Problem with ID {problem_id} not found in the leetcode dataset.")
+                continue
+            cases = parse_examples(dataset[problem_id]["problem"])
+            for model_name in models:
+                model_data = dataset[problem_id].get(model_name, {})
+                solution = model_data.get("solution")
+                if not solution:
+                    continue
+                job = {"problem_id": problem_id, "model": model_name, "code": solution, "cases": cases}
+                # Normalized solutions skip parsing and compiling in the runner
+                meta = model_data.get("solution_meta") or {}
+                if meta.get("valid") and meta.get("solution_hash") == solution_hash(solution):
+                    job.update(method=meta["method"], annotations=meta["annotations"],
+                               bytecode=self.code_cache.bytecode(solution))
+                jobs.append(job)
+
+        scheduler = BenchmarkScheduler(
+            results_path or os.path.join(self.dataset_folder, '.benchmark_results.jsonl'),
+            max_workers=max_workers, repeat=repeat, number=number, timeout=timeout
+        )
+        results = scheduler.run(jobs, resume=resume)
+
+        # Transient failures say nothing about the solution, so they never replace an earlier local_benchmark
+        self._save_dataset("leetcode", dataset, [
+            {"op": "store_eval", "id": problem_id, "model": model_name, "data": {"local_benchmark": metrics}}
+            for (problem_id, model_name), metrics in results.items() if not metrics.get("transient")
+        ])
+        print(f"Benchmarked {len(results)} solutions locally.")
+        return results
+
+    def normalize_solutions(self, dataset_type="leetcode", models=None, problem_ids=None):
+        """
+        Backfill the extraction stage over stored solutions: extract the `class Solution` code, record its entry
+        point under "solution_meta" and precompile it into the code cache. Solutions without a parseable
+        `class Solution` keep their text and only get a solution_meta with the error. Solutions whose solution_meta
+        already matches their text are skipped, so re-running only processes new or edited solutions.
+        All updates are saved in one write. Returns {"normalized": n, "invalid": [(problem_id, model_name)]}.
+        """
+        from .solution_extract import solution_hash
+
+        if dataset_type != "leetcode":
+            raise ValueError("Solution extraction only applies to the leetcode dataset.")
+        dataset = self._load_dataset(dataset_type)
+        if problem_ids is None:
+            problem_ids = list(dataset.keys())
+
+        records = []
+        invalid = []
+        for problem_id in map(str, problem_ids):
+            if problem_id not in dataset:
+                print(f"Problem with ID {problem_id} not found in the {dataset_type} dataset.")
+                continue
+            entry = dataset[problem_id]
+            for model_name in models or entry:
+                if model_name in ("problem", "title_slug", "tags") or not isinstance(entry.get(model_name), dict):
+                    continue
+                solution = entry[model_name].get("solution")
+                meta = entry[model_name].get("solution_meta") or {}
+                if not solution or meta.get("solution_hash") == solution_hash(solution):
+                    continue
+                data = self._solution_data(dataset_type, solution)
+                if not data["solution_meta"]["valid"]:
+                    # Only record why; the original text is left alone
+                    invalid.append((problem_id, model_name))
+                    data = {"solution_meta": data["solution_meta"]}
+                records.append({"op": "update_solution", "id": problem_id, "model": model_name, "data": data})
+
+        if records:
+            self._save_dataset(dataset_type, dataset, records)
+        print(f"Normalized {len(records)} solutions in the {dataset_type} dataset ({len(invalid)} without a "
+              f"parseable `class Solution`).")
+        return {"normalized": len(records), "invalid": invalid}
+
+    def _get_results_table(self, dataset_type, dataset):
+        """Return the columnar results table of the dataset, refreshing only the rows changed since it was built."""
+        from .analytics import ResultsTable
+
+        table = self._results_tables.get(dataset_type)
+        if self._index_is_current(table, dataset_type):
+            table.refresh(dataset)
+            return table
+        table = ResultsTable.build(dataset_type, dataset)
+        table.fingerprint = self.storage.fingerprint(dataset_type)
+        self._results_tables[dataset_type] = table
+        return table
+
+    def summary(self, dataset_type="leetcode", models=None):
+        """
+        Summarize the stored evaluation metrics per model: count, mean, median, std, min and max.
+        Returns {model_name: {metric: stats}}.
+        """
+        from .analytics import summarize
+
+        dataset = self._load_dataset(dataset_type)
+        return summarize(self._get_results_table(dataset_type, dataset), models)
+
+    def generation_summary(self, dataset_type="leetcode", models=None):
+        """
+        Summarize the recorded generation calls per model: latency, time to first token, prompt/completion/reasoning
+        token totals, throughput and finish reasons. Returns {model_name: stats}.
+        """
+        from .analytics import summarize_generation
+
+        return summarize_generation(self._load_dataset(dataset_type), models)
+
+    def compare(self, model_a="gpt-4o", model_b="o1-preview", dataset_type="leetcode", metric=None, by=None,
+                n_bootstrap=10000, confidence=0.95, seed=0):
+        """
+        Compare two models on the problems both were evaluated on: means, medians, win rates, paired differences
+        and a bootstrap confidence interval of the mean difference. metric defaults to weighted_average for
+        LeetCode and weighted_score for math; by can be "tag" or "length" for a per-group breakdown.
+        """
+        from .analytics import DEFAULT_METRIC, compare_models
+
+        dataset = self._load_dataset(dataset_type)
+        table = self._get_results_table(dataset_type, dataset)
+        return compare_models(table, model_a, model_b, metric or DEFAULT_METRIC[dataset_type], by=by,
+                              n_bootstrap=n_bootstrap, confidence=confidence, seed=seed)
 
     def eval(self, problem_id, model_name="gpt-4o", dataset_type="math", runtime_beats=None, memory_beats=None, 
-            correctness_final=None, correctness_steps=None, clarity_explanation=None, completeness=None, appropriate_methods=None):
+            correctness_final=None, correctness_steps=None, clarity_explanation=None, completeness=None, appropriate_methods=None,
+            feedback=None):
         """
         Evaluate a model's solution for a problem in either the math or leetcode dataset.
+        Scores that are not passed are asked for interactively; for LeetCode, feedback is only asked for when
+        the beats were entered interactively too. Use eval_many to store many evaluations at once.
         """
-        # Set dataset path based on dataset_type
-        if dataset_type == "math":
-            dataset_path = self.math_dataset_path
-        elif dataset_type == "leetcode":
-            dataset_path = self.leetcode_dataset_path
-        else:
-            raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
+        from .evaluation import RUBRICS, score_evaluations
 
         # Load the dataset
-        with open(dataset_path, 'r') as f:
-            dataset = json.load(f)
+        dataset = self._load_dataset(dataset_type)
 
         # Check if the problem ID exists in the dataset
         if str(problem_id) not in dataset:
@@ -349,25 +897,17 @@ Your code will be directly submitted to the LeetCode judge, so it must be comple
         # For LeetCode dataset, prompt for runtime and memory if not provided
         if dataset_type == "leetcode":
             try:
+                interactive = runtime_beats is None or memory_beats is None
                 if runtime_beats is None:
                     runtime_beats = float(input("Enter the LeetCode Solution Runtime Beats: "))
                 if memory_beats is None:
                     memory_beats = float(input("Enter the LeetCode Solution Memory Beats: "))
-                feedback = input("Enter feedback: ")
+                if feedback is None and interactive:
+                    feedback = input("Enter feedback: ")
             except ValueError:
                 print("Invalid input. Please enter numeric values for runtime and memory beats.")
                 return
-
-            # Calculate average scores
-            simple_average = (runtime_beats + memory_beats) / 2
-            weighted_average = 0.6 * runtime_beats + 0.4 * memory_beats
-
-            # Update model's evaluation in the dataset
-            dataset[str(problem_id)].setdefault(model_name, {})["runtime_beats"] = runtime_beats
-            dataset[str(problem_id)][model_name]["memory_beats"] = memory_beats
-            dataset[str(problem_id)][model_name]["simple_average"] = simple_average
-            dataset[str(problem_id)][model_name]["weighted_average"] = weighted_average
-            dataset[str(problem_id)][model_name]["feedback"] = feedback
+            scores = {"runtime_beats": runtime_beats, "memory_beats": memory_beats}
 
         elif dataset_type == "math":
             try:
@@ -381,36 +921,65 @@ Your code will be directly submitted to the LeetCode judge, so it must be comple
                     completeness = float(input("Rate the completness on a scale of 1 (Poor) to 5 (Excellent): "))
                 if appropriate_methods is None:
                     appropriate_methods = float(input("Rate the use of appropriate methods and terminology on a scale of 1 (Poor) to 5 (Excellent): "))
-
-                # Check for valid inputs
-                if not all(1 <= score <= 5 for score in [correctness_final, correctness_steps, clarity_explanation, completeness, appropriate_methods]):
-                    print("Invalid scores entered. All scores must be between 1 and 5.")
-                    return
-                    
             except ValueError:
                 print("Invalid input. Please enter values between 1 and 5.")
                 return
+            scores = {"correctness_final": correctness_final, "correctness_steps": correctness_steps,
+                      "clarity_explanation": clarity_explanation, "completeness": completeness,
+                      "appropriate_methods": appropriate_methods}
+        else:
+            raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
 
-            # Calculate weighted score for math
-            weighted_score = (
-                0.25 * correctness_final +
-                0.30 * correctness_steps +
-                0.20 * clarity_explanation +
-                0.15 * completeness +
-                0.10 * appropriate_methods
-            )
-    
-            # Save evaluations for Math
-            model_data = dataset[str(problem_id)].setdefault(model_name, {})
-            model_data["correctness_final"] = correctness_final
-            model_data["correctness_steps"] = correctness_steps
-            model_data["clarity_explanation"] = clarity_explanation
-            model_data["completeness"] = completeness
-            model_data["appropriate_methods"] = appropriate_methods
-            model_data["weighted_score"] = weighted_score
+        # Validate the scores and compute weighted_score (math) or simple/weighted averages (LeetCode)
+        metrics, errors = score_evaluations(dataset_type, [dict(scores, feedback=feedback)])
+        if errors:
+            low, high = RUBRICS[dataset_type]["range"]
+            print(f"Invalid scores entered. All scores must be between {low} and {high}: {errors[0][1]}")
+            return
 
         # Save the updated dataset
-        with open(dataset_path, 'w') as f:
-            json.dump(dataset, f, indent=4)
+        self._save_dataset(dataset_type, dataset, [{"op": "store_eval", "id": str(problem_id), "model": model_name,
+                                                    "data": metrics[0]}])
 
         print(f"Evaluation metrics added to {model_name} for problem ID {problem_id}.")
+
+    def eval_many(self, evaluations, dataset_type="math", skip_invalid=False):
+        """
+        Store many evaluations without prompting. evaluations is a list of dicts with problem_id, model_name, the
+        rubric scores of the dataset (see scripts/evaluation.py) and an optional feedback; load_evaluations reads
+        them from a CSV or JSON-lines file. All rows are validated together and, unless skip_invalid is True,
+        nothing is stored when any row is invalid. Valid evaluations are committed in a single write.
+        Returns {"stored": n, "errors": [(row_index, message)]}.
+        """
+        from .evaluation import score_evaluations
+
+        dataset = self._load_dataset(dataset_type)
+        metrics, errors = score_evaluations(dataset_type, evaluations)
+
+        seen = set()
+        for i, evaluation in enumerate(evaluations):
+            problem_id, model_name = str(evaluation.get("problem_id")), evaluation.get("model_name")
+            if problem_id not in dataset:
+                errors.append((i, f"Problem with ID {problem_id} not found in the {dataset_type} dataset."))
+            elif not isinstance(dataset[problem_id].get(model_name), dict) or not dataset[problem_id][model_name].get("solution"):
+                errors.append((i, f"No solution found for model '{model_name}' in problem ID {problem_id}."))
+            elif (problem_id, model_name) in seen:
+                errors.append((i, f"Duplicate evaluation for model '{model_name}' in problem ID {problem_id}."))
+            seen.add((problem_id, model_name))
+        errors.sort()
+
+        for i, message in errors:
+            print(f"Row {i + 1}: {message}")
+        if errors and not skip_invalid:
+            print(f"No evaluations stored: {len({i for i, _ in errors})} of {len(evaluations)} rows are invalid.")
+            return {"stored": 0, "errors": errors}
+
+        invalid_rows = {i for i, _ in errors}
+        records = [
+            {"op": "store_eval", "id": str(evaluation["problem_id"]), "model": evaluation["model_name"], "data": metrics[i]}
+            for i, evaluation in enumerate(evaluations) if i not in invalid_rows
+        ]
+        if records:
+            self._save_dataset(dataset_type, dataset, records)
+        print(f"Stored {len(records)} evaluations in the {dataset_type} dataset.")
+        return {"stored": len(records), "errors": errors}
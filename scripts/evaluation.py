@@ -0,0 +1,97 @@
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+# Scores entered per dataset type and their allowed range
+RUBRICS = {
+    "math": {"scores": ["correctness_final", "correctness_steps", "clarity_explanation", "completeness",
+                        "appropriate_methods"], "range": (1, 5)},
+    "leetcode": {"scores": ["runtime_beats", "memory_beats"], "range": (0, 100)},
+}
+# Derived metrics as weights over the rubric scores, in rubric order
+WEIGHTS = {
+    "math": {"weighted_score": [0.25, 0.30, 0.20, 0.15, 0.10]},
+    "leetcode": {"simple_average": [0.5, 0.5], "weighted_average": [0.6, 0.4]},
+}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def score_evaluations(dataset_type, rows):
+    """
+    Validate the rubric scores of many evaluations at once and compute their derived metrics.
+    rows is a list of dicts holding the rubric scores (numbers or numeric strings) and an optional feedback.
+    Returns (metrics, errors): one metrics dict per row (None for invalid rows) and a list of (row_index, message).
+    """
+    if dataset_type not in RUBRICS:
+        raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
+    fields = RUBRICS[dataset_type]["scores"]
+    low, high = RUBRICS[dataset_type]["range"]
+
+    scores = np.array([[_to_float(row.get(field)) for field in fields] for row in rows], dtype=float)
+    scores = scores.reshape(len(rows), len(fields))
+    missing = np.isnan(scores)
+    out_of_range = ~missing & ((scores < low) | (scores > high))
+    invalid = (missing | out_of_range).any(axis=1)
+
+    derived = {metric: scores @ np.array(weights) for metric, weights in WEIGHTS[dataset_type].items()}
+
+    metrics, errors = [], []
+    for i in np.flatnonzero(invalid):
+        problems = [f"{field} is missing or not a number" for field in np.array(fields)[missing[i]]]
+        problems += [f"{field}={scores[i, j]:g} is outside {low}-{high}" for j, field in enumerate(fields)
+                     if out_of_range[i, j]]
+        errors.append((int(i), "; ".join(problems)))
+    for i, row in enumerate(rows):
+        if invalid[i]:
+            metrics.append(None)
+            continue
+        entry = {field: float(scores[i, j]) for j, field in enumerate(fields)}
+        entry.update({metric: float(values[i]) for metric, values in derived.items()})
+        if row.get("feedback") not in (None, ""):
+            entry["feedback"] = row["feedback"]
+        metrics.append(entry)
+    return metrics, errors
+
+
+def load_evaluations(path):
+    """
+    Read evaluations from a CSV file with a header row or a JSON-lines file (one object per line).
+    Each evaluation needs problem_id and model_name (or model) plus the rubric scores of its dataset.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    for row in rows:
+        if "model_name" not in row and "model" in row:
+            row["model_name"] = row.pop("model")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store evaluation scores for many problems and models at once.")
+    parser.add_argument("path", help="CSV or JSON-lines file with problem_id, model_name and rubric scores.")
+    parser.add_argument("--dataset-type", choices=sorted(RUBRICS), required=True)
+    parser.add_argument("--dataset-folder", default=None,
+                        help="Dataset folder (default: $PROBLEMSET_DATASET_FOLDER or the repository root).")
+    parser.add_argument("--skip-invalid", action="store_true", help="Store the valid rows even if others are invalid.")
+    args = parser.parse_args()
+
+    from .data_manager import DatasetManager
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist.")
+    result = DatasetManager(args.dataset_folder).eval_many(load_evaluations(args.path), args.dataset_type,
+                                                           skip_invalid=args.skip_invalid)
+    raise SystemExit(1 if result["errors"] else 0)
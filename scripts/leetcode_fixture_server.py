@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class LeetCodeFixtureServer:
+    """
+    Offline stand-in for the alfa-leetcode-api. Serves recorded responses from a fixture directory laid out
+    the way LeetCodeIngestor writes its cache:
+        <fixture_dir>/problems/<tags>.json     for /problems?tags=<tags>&limit=...
+        <fixture_dir>/select/<titleSlug>.json  for /select?titleSlug=<titleSlug>
+    """
+
+    def __init__(self, fixture_dir, host="127.0.0.1", port=0):
+        self.fixture_dir = fixture_dir
+        handler = self._make_handler()
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        fixture_dir = self.fixture_dir
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+                if parsed.path == "/problems" and "tags" in params:
+                    path = os.path.join(fixture_dir, "problems", f"{params['tags'][0]}.json")
+                elif parsed.path == "/select" and "titleSlug" in params:
+                    path = os.path.join(fixture_dir, "select", f"{params['titleSlug'][0]}.json")
+                else:
+                    path = None
+                if path is None or not os.path.exists(path):
+                    self._send(404, {"error": f"No fixture recorded for {self.path}"})
+                    return
+                with open(path, 'r') as f:
+                    self._send(200, json.load(f))
+
+            def _send(self, status, data):
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        """Serve in a background thread and return the base URL to pass as LeetCodeIngestor(api_url=...)."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded alfa-leetcode-api responses offline.")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    args = parser.parse_args()
+    server = LeetCodeFixtureServer(args.fixture_dir, args.host, args.port)
+    print(f"Serving fixtures from {args.fixture_dir} at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,155 @@
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_API_URL = "https://alfa-leetcode-api.onrender.com"
+
+
+class LeetCodeIngestor:
+    """
+    Fetches problems from the alfa-leetcode-api and adds them to the LeetCode dataset in one batched insert.
+    Requests share a pooled session with timeouts and retries, problem descriptions are fetched concurrently,
+    and responses are cached on disk by titleSlug so re-runs skip problems that were already fetched.
+    The cache directory uses the same layout that LeetCodeFixtureServer serves, so it doubles as an offline fixture.
+    """
+
+    def __init__(self, manager, api_url=DEFAULT_API_URL, cache_dir=None, max_workers=8, timeout=30, retries=3):
+        self.manager = manager
+        self.api_url = api_url.rstrip('/')
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _cache_path(self, kind, key):
+        return os.path.join(self.cache_dir, kind, f"{key}.json")
+
+    def _read_cache(self, kind, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(kind, key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, kind, key, data):
+        if not self.cache_dir:
+            return
+        path = self._cache_path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+
+    def _get(self, path, params):
+        r = self.session.get(f"{self.api_url}{path}", params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def fetch_problem_list(self, tag, limit_num=100):
+        """Fetch the problem listing for a tag. Listings are always fetched fresh but recorded in the cache."""
+        data = self._get("/problems", {"tags": tag, "limit": limit_num})
+        self._write_cache("problems", tag, data)
+        return data['problemsetQuestionList']
+
+    def fetch_problem(self, title_slug):
+        """Fetch a single problem by titleSlug, using the on-disk cache when available."""
+        data = self._read_cache("select", title_slug)
+        if data is None:
+            data = self._get("/select", {"titleSlug": title_slug})
+            self._write_cache("select", title_slug, data)
+        return data
+
+    def _fetch_many(self, fetch, keys):
+        """Run fetch over keys on the worker pool, returning {key: result} for the calls that succeeded."""
+        def run(key):
+            try:
+                return key, fetch(key)
+            except Exception as e:
+                print(f"Error fetching {key}: {e}")
+                return key, None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return {key: result for key, result in executor.map(run, keys) if result is not None}
+
+    def ingest(self, tags, limit_num=100, max_new=15, difficulty="Hard"):
+        """
+        Add up to max_new random problems of the given difficulty from one or more tags to the LeetCode dataset.
+        Problems whose title_slug or text is already in the dataset are skipped. Returns the new problem IDs.
+        """
+        if isinstance(tags, str):
+            tags = [tags]
+
+        listings = self._fetch_many(lambda tag: self.fetch_problem_list(tag, limit_num), tags)
+        candidates = []
+        for tag in tags:
+            for q in listings.get(tag, []):
+                if q['difficulty'] == difficulty and q['titleSlug'] not in candidates:
+                    candidates.append(q['titleSlug'])
+        random.shuffle(candidates)
+
+        dataset = self.manager._load_dataset("leetcode")
+        index = self.manager._get_index("leetcode", dataset)
+        candidates = [slug for slug in candidates if index.find_slug(slug) is None]
+
+        problems = []
+        seen_descriptions = set()
+        while len(problems) < max_new and candidates:
+            # Fetch just enough candidates to fill the remaining slots, then top up if some are unusable
+            batch, candidates = candidates[:max_new - len(problems)], candidates[max_new - len(problems):]
+            fetched = self._fetch_many(self.fetch_problem, batch)
+            for slug in batch:
+                if slug not in fetched:
+                    continue
+                problem_data = fetched[slug]
+                problem_description = (problem_data.get("question") or "") + (problem_data.get("exampleTestcases") or "")
+                if not problem_description or index.find(problem_description) is not None:
+                    continue
+                if problem_description in seen_descriptions:
+                    continue
+                seen_descriptions.add(problem_description)
+                new_problem_data = {"title_slug": slug, "problem": problem_description}
+                topic_tags = [t["slug"] for t in problem_data.get("topicTags") or [] if t.get("slug")]
+                if topic_tags:
+                    new_problem_data["tags"] = topic_tags
+                problems.append(new_problem_data)
+
+        new_ids = self.manager.add_problems(problems, dataset_type="leetcode")
+        if len(new_ids) < max_new:
+            print(f"Warning: Only able to add {len(new_ids)} problems. Consider increasing the limit_num or adding more tags.")
+        return new_ids
+
+    def backfill_tags(self, problem_ids=None, overwrite=False):
+        """
+        Store the topic tags of existing problems under "tags", fetched by title_slug. Problems that already
+        have tags are skipped unless overwrite is True. All updates are saved in one write.
+        Returns the IDs of the updated problems.
+        """
+        dataset = self.manager._load_dataset("leetcode")
+        if problem_ids is None:
+            problem_ids = list(dataset.keys())
+        slugs = {}
+        for problem_id in map(str, problem_ids):
+            entry = dataset.get(problem_id)
+            if entry and entry.get("title_slug") and (overwrite or not entry.get("tags")):
+                slugs[problem_id] = entry["title_slug"]
+
+        fetched = self._fetch_many(self.fetch_problem, sorted(set(slugs.values())))
+        changes = []
+        for problem_id, slug in slugs.items():
+            topic_tags = [t["slug"] for t in (fetched.get(slug) or {}).get("topicTags") or [] if t.get("slug")]
+            if topic_tags:
+                changes.append({"op": "update_problem", "id": problem_id, "data": {"tags": topic_tags}})
+        if changes:
+            self.manager._save_dataset("leetcode", dataset, changes)
+        return [change["id"] for change in changes]
@@ -0,0 +1,279 @@
+import itertools
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+# Default rate limits of the built-in providers, kept at the low end of the providers' usage tiers.
+# Each can be overridden with the environment variable of the same name; 0 turns the limit off.
+DEFAULT_LIMITS = {
+    "OPENAI_REQUESTS_PER_MINUTE": 500,
+    "OPENAI_TOKENS_PER_MINUTE": 150_000,
+    "OPENROUTER_REQUESTS_PER_MINUTE": 200,
+    "OPENROUTER_TOKENS_PER_MINUTE": 0,
+}
+
+
+def _limit(name):
+    """Return the rate limit named by name from the environment or DEFAULT_LIMITS, or None when it is off."""
+    value = os.environ.get(name)
+    try:
+        limit = float(value) if value not in (None, "") else DEFAULT_LIMITS[name]
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got '{value}'.")
+    return limit or None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` units per second up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        """Block until `amount` units are available and take them. Returns the time spent waiting."""
+        # A request larger than the bucket would never fit, so it only waits for a full bucket
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._level >= amount:
+                    self._level -= amount
+                    return waited
+                delay = (amount - self._level) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def refund(self, amount):
+        """Return units that were reserved but not used (or take more when amount is negative)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level + amount)
+
+
+class Provider:
+    """
+    An OpenAI-compatible endpoint. Clients are created once per API key and each keeps an HTTP connection pool
+    of up to max_connections. requests_per_minute and tokens_per_minute, when set, are enforced with token
+    buckets shared by every caller, and a rate-limit response pauses all callers of the provider.
+    """
+
+    def __init__(self, name, base_url=None, api_key=None, api_key_env=None, requests_per_minute=None,
+                 tokens_per_minute=None, max_connections=20):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.api_key_env = api_key_env
+        self.max_connections = max_connections
+        self.request_bucket = TokenBucket(requests_per_minute / 60, requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def resolve_key(self, api_key=None):
+        key = api_key or self.api_key or (os.environ.get(self.api_key_env) if self.api_key_env else None)
+        if not key:
+            raise ValueError(f"No API key for provider '{self.name}'. Pass one or set {self.api_key_env}.")
+        return key
+
+    def _create_client(self, api_key):
+        http_client = DefaultHttpxClient(limits=httpx.Limits(max_connections=self.max_connections,
+                                                             max_keepalive_connections=self.max_connections))
+        # Retries are handled by DatasetManager._request_solution so that backoff is applied consistently
+        return OpenAI(base_url=self.base_url, api_key=api_key, max_retries=0, http_client=http_client)
+
+    def client(self, api_key=None):
+        """Return the long-lived client for the given (or configured) API key, creating it on first use."""
+        api_key = self.resolve_key(api_key)
+        with self._lock:
+            if api_key not in self._clients:
+                self._clients[api_key] = self._create_client(api_key)
+            return self._clients[api_key]
+
+    def acquire(self, tokens):
+        """Wait for the request and token budgets of one call. Returns the time spent waiting."""
+        waited = 0.0
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            waited += delay
+        if self.request_bucket:
+            waited += self.request_bucket.acquire()
+        if self.token_bucket:
+            waited += self.token_bucket.acquire(tokens)
+        return waited
+
+    def record_usage(self, reserved, used):
+        """Give back the part of a token reservation the call did not use."""
+        if self.token_bucket and used is not None:
+            self.token_bucket.refund(reserved - used)
+
+    def pause(self, seconds):
+        """Hold back every caller of this provider, e.g. after a rate-limit response."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+class _FakeCompletions:
+    def __init__(self, provider):
+        self._provider = provider
+
+    def create(self, model, messages, stream=False, stream_options=None, **kwargs):
+        content = self._provider.respond(model, messages)
+        usage = {"prompt_tokens": sum(len(m["content"]) for m in messages) // 4,
+                 "completion_tokens": len(content) // 4,
+                 "completion_tokens_details": {"reasoning_tokens": 0}}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"fake-{next(self._provider.calls)}"
+        if not stream:
+            return ChatCompletion.model_validate({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": self._provider.finish_reason}],
+                "usage": usage,
+            })
+
+        def chunks():
+            pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+            for piece, finish_reason in zip(pieces + [""], [None] * len(pieces) + [self._provider.finish_reason]):
+                yield ChatCompletionChunk.model_validate({
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece or None}, "finish_reason": finish_reason}],
+                })
+            if stream_options and stream_options.get("include_usage"):
+                yield ChatCompletionChunk.model_validate({
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": [], "usage": usage,
+                })
+        return chunks()
+
+
+class _FakeClient:
+    """Stands in for an OpenAI client: only chat.completions.create is implemented."""
+
+    def __init__(self, provider):
+        self.base_url = f"fake://{provider.name}/"
+        self.chat = SimpleNamespace(completions=_FakeCompletions(provider))
+
+    def close(self):
+        pass
+
+
+class FakeProvider(Provider):
+    """
+    Offline provider for tests and dry runs. Every request is answered locally by responder(model, messages),
+    which defaults to a fixed `class Solution`; latency adds a sleep per call and finish_reason is reported
+    for every response (e.g. "length" to simulate truncation). Rate limits apply as usual.
+    """
+
+    DEFAULT_RESPONSE = "```python\nclass Solution:\n    def solve(self, *args):\n        return None\n```"
+
+    def __init__(self, name="fake", responder=None, latency=0.0, finish_reason="stop", **limits):
+        super().__init__(name, base_url=f"fake://{name}/", api_key="fake", **limits)
+        self.responder = responder
+        self.latency = latency
+        self.finish_reason = finish_reason
+        self.calls = itertools.count(1)
+
+    def respond(self, model, messages):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.responder(model, messages) if self.responder else self.DEFAULT_RESPONSE
+
+    def _create_client(self, api_key):
+        return _FakeClient(self)
+
+
+class ModelConfig:
+    """How to call one model: its provider, the provider's model id and the request limits to send."""
+
+    def __init__(self, name, provider, model_id=None, max_tokens=16000, temperature=0):
+        self.name = name
+        self.provider = provider
+        self.model_id = model_id or name
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+
+class ModelRegistry:
+    """
+    Maps model names to providers and request settings. Models that are not registered are sent to the
+    default provider under their own name, which keeps plain OpenAI model names working without registration.
+    """
+
+    def __init__(self, default_provider="openai"):
+        self.providers = {}
+        self.models = {}
+        self.default_provider = default_provider
+        self._lock = threading.Lock()
+
+    def register_provider(self, provider):
+        self.providers[provider.name] = provider
+        return provider
+
+    def register_model(self, name, provider, model_id=None, max_tokens=16000, temperature=0):
+        if provider not in self.providers:
+            raise ValueError(f"Unknown provider '{provider}'. Choose from {sorted(self.providers)}.")
+        self.models[name] = ModelConfig(name, provider, model_id, max_tokens, temperature)
+        return self.models[name]
+
+    def resolve(self, model_name, base_url=None):
+        """
+        Return (ModelConfig, Provider) for a model. base_url overrides the provider's endpoint; the override
+        gets its own provider (and connection pool) without rate limits.
+        """
+        config = self.models.get(model_name) or ModelConfig(model_name, self.default_provider)
+        provider = self.providers[config.provider]
+        if base_url and base_url != provider.base_url:
+            with self._lock:
+                name = f"{config.provider}@{base_url}"
+                if name not in self.providers:
+                    self.providers[name] = Provider(name, base_url, provider.api_key, provider.api_key_env,
+                                                    max_connections=provider.max_connections)
+                provider = self.providers[name]
+        return config, provider
+
+    def close(self):
+        for provider in self.providers.values():
+            provider.close()
+
+
+def default_registry():
+    """
+    The registry used by DatasetManager unless one is passed: GPT models on OpenAI, o1-preview on OpenRouter.
+    Both providers are rate limited by default (see DEFAULT_LIMITS).
+    """
+    registry = ModelRegistry()
+    registry.register_provider(Provider("openai", api_key_env="OPENAI_API_KEY",
+                                        requests_per_minute=_limit("OPENAI_REQUESTS_PER_MINUTE"),
+                                        tokens_per_minute=_limit("OPENAI_TOKENS_PER_MINUTE")))
+    registry.register_provider(Provider("openrouter", OPENROUTER_URL, api_key_env="OPENROUTER_API_KEY",
+                                        requests_per_minute=_limit("OPENROUTER_REQUESTS_PER_MINUTE"),
+                                        tokens_per_minute=_limit("OPENROUTER_TOKENS_PER_MINUTE")))
+    registry.register_provider(FakeProvider())
+    registry.register_model("gpt-4o", "openai")
+    registry.register_model("o1-preview", "openrouter", "openai/o1-preview")
+    registry.register_model("fake", "fake")
+    return registry
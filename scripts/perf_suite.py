@@ -0,0 +1,320 @@
+"""
+End-to-end performance benchmarks of DatasetManager on synthetic datasets.
+
+    python -m scripts.perf_suite --sizes 1000 10000 100000 --backends json sqlite --output perf_report.json
+    python -m scripts.perf_suite --sizes 1000 10000 --compare perf_report.json
+
+Each (size, backend) pair gets a freshly generated dataset folder. Every operation is timed over --calls
+invocations and then run once more under tracemalloc for its peak allocation. Model calls go to a local stub
+of the chat completions endpoint and LeetCode imports to a LeetCodeFixtureServer, so no network access is needed.
+Reports are JSON files; --compare prints the median-time ratio against an earlier report and exits with status 1
+when an operation got slower than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .data_manager import DatasetManager
+from .leetcode_fixture_server import LeetCodeFixtureServer
+from .storage import JournalStorage, JsonFileStorage, SqliteStorage
+
+REPORT_VERSION = 1
+BACKENDS = {"json": JsonFileStorage, "journal": JournalStorage, "sqlite": SqliteStorage}
+OPERATIONS = ["load", "add_problem", "_is_duplicate", "remove_problem", "prompt_llm", "eval", "query_leetcode_problems"]
+
+WORDS = ("integer array string graph node edge tree matrix sum minimum maximum return given length index value "
+         "subarray substring path cost query range distinct prime modulo order sorted pair count number each the "
+         "of and to in is for that with at most least exactly such every function prove show let be").split()
+SOLUTION_CODE = "class Solution:\n    def solve(self, nums):\n        return sum(nums)"
+SOLUTION = f"```python\n{SOLUTION_CODE}\n```"
+
+
+def synthetic_text(rng, i, text_length):
+    """A unique pseudo problem statement of roughly text_length characters."""
+    words = rng.choices(WORDS, k=max(text_length // 6, 1))
+    return f"Problem {i}: " + " ".join(words)[:text_length]
+
+
+def synthetic_leetcode_problem(rng, i, text_length):
+    nums = [rng.randint(-100, 100) for _ in range(rng.randint(1, 8))]
+    return (f"<p>{synthetic_text(rng, i, text_length)}</p>\n<p><strong>Example 1:</strong></p>\n<pre>\n"
+            f"<strong>Input:</strong> nums = {json.dumps(nums)}\n<strong>Output:</strong> {sum(nums)}\n</pre>")
+
+
+def generate_datasets(size, seed=0, text_length=600):
+    """
+    Return (math, leetcode) datasets of `size` problems each. Every LeetCode problem and half of the math
+    problems have gpt-4o and o1-preview solutions with evaluations, roughly like the real datasets.
+    """
+    rng = random.Random(seed)
+    math, leetcode = {}, {}
+    for i in range(1, size + 1):
+        math[str(i)] = {"problem": synthetic_text(rng, i, text_length)}
+        leetcode[str(i)] = {"title_slug": f"synthetic-problem-{i}",
+                            "problem": synthetic_leetcode_problem(rng, i, text_length),
+                            "tags": rng.sample(["array", "graph", "dynamic-programming", "math", "string"], 2)}
+        for model_name in ("gpt-4o", "o1-preview"):
+            beats = [rng.uniform(0, 100), rng.uniform(0, 100)]
+            leetcode[str(i)][model_name] = {
+                "solution": SOLUTION_CODE, "runtime_beats": beats[0],
+                "memory_beats": beats[1], "simple_average": sum(beats) / 2,
+                "weighted_average": 0.6 * beats[0] + 0.4 * beats[1], "feedback": ""
+            }
+            if i % 2:
+                scores = [rng.randint(1, 5) for _ in range(5)]
+                math[str(i)][model_name] = dict(
+                    zip(["correctness_final", "correctness_steps", "clarity_explanation", "completeness",
+                         "appropriate_methods"], scores),
+                    solution=synthetic_text(rng, i, text_length),
+                    weighted_score=sum(w * s for w, s in zip([0.25, 0.30, 0.20, 0.15, 0.10], scores))
+                )
+    return math, leetcode
+
+
+def write_fixtures(fixture_dir, tags, per_tag, seed=0, text_length=600):
+    """Record alfa-leetcode-api responses for `per_tag` new Hard problems under each tag."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(fixture_dir, "problems"), exist_ok=True)
+    os.makedirs(os.path.join(fixture_dir, "select"), exist_ok=True)
+    for tag in tags:
+        listing = []
+        for j in range(per_tag):
+            slug = f"fixture-{tag}-{j}"
+            listing.append({"titleSlug": slug, "difficulty": "Hard"})
+            with open(os.path.join(fixture_dir, "select", f"{slug}.json"), 'w') as f:
+                json.dump({"question": synthetic_leetcode_problem(rng, f"{tag}-{j}", text_length),
+                           "exampleTestcases": "", "topicTags": [{"slug": tag}]}, f)
+        with open(os.path.join(fixture_dir, "problems", f"{tag}.json"), 'w') as f:
+            json.dump({"problemsetQuestionList": listing}, f)
+
+
+class StubOpenAIServer:
+    """Local stand-in for an OpenAI-compatible /chat/completions endpoint that answers every request with SOLUTION."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if server.latency:
+                    time.sleep(server.latency)
+                usage = {"prompt_tokens": sum(len(m["content"]) for m in request["messages"]) // 4,
+                         "completion_tokens": len(SOLUTION) // 4}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                base = {"id": "stub", "created": int(time.time()), "model": request["model"]}
+                if request.get("stream"):
+                    chunks = [dict(base, object="chat.completion.chunk",
+                                   choices=[{"index": 0, "delta": {"content": SOLUTION}, "finish_reason": "stop"}])]
+                    if (request.get("stream_options") or {}).get("include_usage"):
+                        chunks.append(dict(base, object="chat.completion.chunk", choices=[], usage=usage))
+                    body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+                    self._send(body.encode('utf-8'), "text/event-stream")
+                    return
+                response = dict(base, object="chat.completion", usage=usage, choices=[
+                    {"index": 0, "message": {"role": "assistant", "content": SOLUTION}, "finish_reason": "stop"}])
+                self._send(json.dumps(response).encode('utf-8'), "application/json")
+
+            def _send(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+def measure(operation, calls):
+    """
+    Time operation(i) for i in range(calls), then run operation(calls) under tracemalloc for its peak allocation.
+    The manager's console output is discarded.
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(calls):
+            start = time.perf_counter()
+            operation(i)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            operation(calls)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "calls": calls,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "max_s": max(times),
+        "peak_memory_kb": peak_memory / 1024,
+    }
+
+
+def _operations(manager, folder, backend, size, calls, seed, text_length, stub_url, fixture_url):
+    rng = random.Random(seed + 1)
+    math_dataset = manager._load_dataset("math")
+    # Alternate between a known problem and an unseen one so both duplicate-check outcomes are covered
+    duplicate_checks = [math_dataset[str(i + 1)]["problem"] if i % 2 == 0 else synthetic_text(rng, -i, text_length)
+                        for i in range(calls + 1)]
+    new_problems = [synthetic_text(rng, size + 1 + i, text_length) for i in range(calls + 1)]
+    return {
+        "load": lambda i: DatasetManager(folder, storage=BACKENDS[backend](folder))._load_dataset("leetcode"),
+        "add_problem": lambda i: manager.add_problem(new_problems[i], "math"),
+        "_is_duplicate": lambda i: manager._is_duplicate(duplicate_checks[i], "math", math_dataset),
+        "remove_problem": lambda i: manager.remove_problem(size - i, "math"),
+        "prompt_llm": lambda i: manager.prompt_llm("stub", i + 1, "gpt-4o", "leetcode", base_url=stub_url,
+                                                   use_cache=False),
+        "eval": lambda i: manager.eval(i + 1, "gpt-4o", "leetcode", runtime_beats=50.0, memory_beats=50.0),
+        "query_leetcode_problems": lambda i: manager.query_leetcode_problems(f"tag{i}", limit_num=50, max_new=5,
+                                                                             api_url=fixture_url),
+    }
+
+
+def run_suite(sizes=(1000, 10000, 100000), backends=("json",), operations=OPERATIONS, calls=5, seed=0,
+              text_length=600, in_memory=False, workdir=None):
+    """Run every operation for every (size, backend) pair and return the report dict."""
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="perf_suite_")
+    results = []
+    try:
+        fixture_dir = os.path.join(workdir, "fixtures")
+        write_fixtures(fixture_dir, [f"tag{i}" for i in range(calls + 1)], per_tag=10, seed=seed,
+                       text_length=text_length)
+        with StubOpenAIServer() as stub, LeetCodeFixtureServer(fixture_dir) as fixtures:
+            for size in sizes:
+                math, leetcode = generate_datasets(size, seed, text_length)
+                for backend in backends:
+                    folder = os.path.join(workdir, f"{backend}-{size}")
+                    os.makedirs(folder, exist_ok=True)
+                    storage = BACKENDS[backend](folder)
+                    storage.replace("math", math)
+                    storage.replace("leetcode", leetcode)
+                    manager = DatasetManager(folder, in_memory=in_memory, storage=storage)
+                    ops = _operations(manager, folder, backend, size, calls, seed, text_length, stub.url,
+                                      fixtures.url)
+                    for name in operations:
+                        stats = measure(ops[name], calls)
+                        results.append(dict({"op": name, "size": size, "backend": backend}, **stats))
+                        print(f"{name:<24} size={size:<7} backend={backend:<8} median={stats['median_s'] * 1000:10.2f} ms"
+                              f"  peak={stats['peak_memory_kb']:10.1f} KiB")
+                    manager.flush()
+                    if hasattr(storage, "close"):
+                        storage.close()
+                    shutil.rmtree(folder, ignore_errors=True)
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "report_version": REPORT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"sizes": list(sizes), "backends": list(backends), "calls": calls, "seed": seed,
+                   "text_length": text_length, "in_memory": in_memory},
+        "results": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(baseline, current, threshold=1.25):
+    """
+    Pair the results of two reports by (op, size, backend) and return one row per pair with the ratio of the
+    median times; rows whose ratio exceeds threshold are marked as regressions.
+    """
+    base = {(r["op"], r["size"], r["backend"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = (result["op"], result["size"], result["backend"])
+        if key not in base:
+            continue
+        ratio = result["median_s"] / base[key]["median_s"] if base[key]["median_s"] else float("inf")
+        rows.append({"op": key[0], "size": key[1], "backend": key[2], "baseline_median_s": base[key]["median_s"],
+                     "median_s": result["median_s"], "ratio": ratio,
+                     "memory_ratio": (result["peak_memory_kb"] / base[key]["peak_memory_kb"]
+                                      if base[key]["peak_memory_kb"] else None),
+                     "regression": ratio > threshold})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DatasetManager operations on synthetic datasets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=["json"])
+    parser.add_argument("--ops", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--calls", type=int, default=5, help="Timed calls per operation.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--text-length", type=int, default=600, help="Approximate characters per problem.")
+    parser.add_argument("--in-memory", action="store_true", help="Benchmark DatasetManager(in_memory=True).")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Earlier report to compare the median times against.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression.")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.backends, args.ops, args.calls, args.seed, args.text_length, args.in_memory)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Report written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        rows = compare_reports(baseline, report, args.threshold)
+        print(f"\nCompared with {args.compare} (commit {baseline.get('commit')}):")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['op']:<24} size={row['size']:<7} backend={row['backend']:<8} x{row['ratio']:.2f}{flag}")
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import random
+import re
+import zlib
+
+from .storage import write_json_atomic
+
+INDEX_VERSION = 1
+
+
+def normalize_problem_text(problem_str):
+    """Collapse whitespace and case so that trivially reformatted copies of a problem compare equal."""
+    return " ".join(problem_str.split()).casefold()
+
+
+def problem_hash(problem_str):
+    """Return the content hash of a problem statement after normalization."""
+    return hashlib.sha1(normalize_problem_text(problem_str).encode('utf-8')).hexdigest()
+
+
+class ProblemIndex:
+    """
+    Lookup tables over a dataset: normalized problem hash -> problem_id and title_slug -> problem_id,
+    plus the highest problem ID. The index is stored next to the dataset and tagged with the storage
+    fingerprint it was built from, so a stale or missing index is rebuilt on first use.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.slugs = {}
+        # problem_id -> [hash, title_slug], used to drop the right keys when a problem is removed
+        self.entries = {}
+        self.max_id = 0
+        self.fingerprint = None
+
+    @classmethod
+    def build(cls, dataset):
+        """Build an index by scanning every problem in the dataset."""
+        index = cls()
+        for problem_id, problem_data in dataset.items():
+            index.add(problem_id, problem_data)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """Load a persisted index, returning None if it is missing or unreadable."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        index = cls()
+        index.entries = data["entries"]
+        index.max_id = data["max_id"]
+        index.fingerprint = data["fingerprint"]
+        for problem_id, (text_hash, title_slug) in index.entries.items():
+            index.hashes[text_hash] = problem_id
+            if title_slug:
+                index.slugs[title_slug] = problem_id
+        return index
+
+    def save(self, path, fingerprint):
+        """Persist the index tagged with the storage fingerprint it matches."""
+        self.fingerprint = fingerprint
+        write_json_atomic(path, {
+            "version": INDEX_VERSION,
+            "fingerprint": fingerprint,
+            "max_id": self.max_id,
+            "entries": self.entries
+        })
+
+    def add(self, problem_id, problem_data):
+        problem_id = str(problem_id)
+        text_hash = problem_hash(problem_data["problem"])
+        title_slug = problem_data.get("title_slug")
+        self.entries[problem_id] = [text_hash, title_slug]
+        self.hashes[text_hash] = problem_id
+        if title_slug:
+            self.slugs[title_slug] = problem_id
+        self.max_id = max(self.max_id, int(problem_id))
+
+    def remove(self, problem_id):
+        problem_id = str(problem_id)
+        if problem_id not in self.entries:
+            return
+        text_hash, title_slug = self.entries.pop(problem_id)
+        if self.hashes.get(text_hash) == problem_id:
+            del self.hashes[text_hash]
+        if title_slug and self.slugs.get(title_slug) == problem_id:
+            del self.slugs[title_slug]
+        if int(problem_id) == self.max_id:
+            self.max_id = max(map(int, self.entries), default=0)
+
+    def apply_change(self, change):
+        """Keep the index in step with a storage mutation record."""
+        if change["op"] == "add_problem":
+            self.add(change["id"], change["data"])
+        elif change["op"] == "remove_problem":
+            self.remove(change["id"])
+
+    def find(self, problem_str):
+        """Return the ID of a problem with the same normalized text, or None."""
+        return self.hashes.get(problem_hash(problem_str))
+
+    def find_slug(self, title_slug):
+        """Return the ID of the problem with the given title_slug, or None."""
+        return self.slugs.get(title_slug)
+
+    def matches(self, dataset):
+        """Cheap consistency check against a loaded dataset."""
+        return len(self.entries) == len(dataset)
+
+
+class MinHashIndex:
+    """
+    Near-duplicate detection for reworded problem statements. Each problem is reduced to a set of word
+    shingles, summarized by a MinHash signature, and bucketed with banded LSH so a query only compares
+    against problems that share at least one band.
+    """
+
+    _MERSENNE_PRIME = (1 << 61) - 1
+    _TAG_RE = re.compile(r'<[^>]+>')
+    _WORD_RE = re.compile(r'\w+')
+
+    def __init__(self, num_perm=64, bands=16, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, self._MERSENNE_PRIME), rng.randrange(0, self._MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+        self.signatures = {}
+        self._buckets = {}
+
+    def shingles(self, problem_str):
+        """Return the set of hashed word shingles of a problem, ignoring HTML markup and case."""
+        words = self._WORD_RE.findall(self._TAG_RE.sub(' ', problem_str).casefold())
+        if len(words) < self.shingle_size:
+            words = words + [''] * (self.shingle_size - len(words))
+        return {
+            zlib.crc32(' '.join(words[i:i + self.shingle_size]).encode('utf-8'))
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, problem_str):
+        shingles = self.shingles(problem_str)
+        prime = self._MERSENNE_PRIME
+        return [min((a * s + b) % prime for s in shingles) for a, b in self._perms]
+
+    def _band_keys(self, signature):
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def add(self, problem_id, problem_str):
+        problem_id = str(problem_id)
+        self.remove(problem_id)
+        signature = self.signature(problem_str)
+        self.signatures[problem_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(problem_id)
+
+    def remove(self, problem_id):
+        signature = self.signatures.pop(str(problem_id), None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            self._buckets[key].discard(str(problem_id))
+
+    def apply_change(self, change):
+        if change["op"] == "add_problem":
+            self.add(change["id"], change["data"]["problem"])
+        elif change["op"] == "remove_problem":
+            self.remove(change["id"])
+
+    def query(self, problem_str, threshold=0.8):
+        """Return [(problem_id, estimated_jaccard)] for indexed problems at or above the threshold, best first."""
+        signature = self.signature(problem_str)
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        matches = []
+        for problem_id in candidates:
+            other = self.signatures[problem_id]
+            similarity = sum(x == y for x, y in zip(signature, other)) / self.num_perm
+            if similarity >= threshold:
+                matches.append((problem_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
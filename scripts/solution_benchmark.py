@@ -0,0 +1,164 @@
+import base64
+import html
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+RUNNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solution_runner.py')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_EXAMPLE_RE = re.compile(
+    r'Input:?\s*(?P<input>.*?)\s*Output:?\s*(?P<output>.*?)\s*(?=Explanation:|Example\s*\d+:|Constraints:|Follow[- ]up|Note:|Input:|$)',
+    re.S
+)
+
+
+def _split_top_level(text, separator=','):
+    """Split text on separator characters that are not nested inside brackets or quotes."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == '\\':
+                continue
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '[{(':
+            depth += 1
+        elif char in ']})':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_value(text):
+    """Parse a LeetCode example literal (JSON-like, with true/false/null) into a Python value."""
+    text = text.strip().rstrip('.')
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    # Unquoted single characters/words, e.g. Output: a
+    if re.fullmatch(r'[A-Za-z_]\w*', text):
+        return text
+    raise ValueError(f"Could not parse example value: {text!r}")
+
+
+def parse_examples(problem_html):
+    """
+    Extract the example test cases from a LeetCode problem statement.
+    Returns a list of {"args": [...], "expected": ...} in parameter order; examples that cannot be parsed are skipped.
+    """
+    text = html.unescape(_TAG_RE.sub('', problem_html)).replace('\xa0', ' ')
+    cases = []
+    for match in _EXAMPLE_RE.finditer(text):
+        output = match.group('output').strip().split('\n')[0]
+        assignments = _split_top_level(' '.join(match.group('input').split()))
+        try:
+            args = []
+            for assignment in assignments:
+                name, sep, value = assignment.partition('=')
+                if not sep or not name.strip().isidentifier():
+                    raise ValueError(f"Unexpected input format: {assignment!r}")
+                args.append(parse_value(value))
+            cases.append({"args": args, "expected": parse_value(output)})
+        except ValueError:
+            continue
+    return cases
+
+
+def outputs_match(actual, expected, tolerance=1e-5):
+    """Compare a solution output with the expected one, allowing a small tolerance for floats."""
+    if isinstance(expected, float) or isinstance(actual, float):
+        try:
+            return math.isclose(float(actual), float(expected), rel_tol=tolerance, abs_tol=tolerance)
+        except (TypeError, ValueError):
+            return False
+    if isinstance(expected, list) and isinstance(actual, list):
+        return len(actual) == len(expected) and all(outputs_match(a, e, tolerance) for a, e in zip(actual, expected))
+    return actual == expected
+
+
+def _limit_resources(cpu_seconds, memory_bytes):
+    def apply():
+        if resource is None:
+            return
+        if cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        if memory_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    return apply
+
+
+def benchmark_solution(code, cases, method=None, repeat=5, number=10, timeout=30,
+                       cpu_seconds=None, memory_bytes=2 * 1024 ** 3, annotations=None, bytecode=None):
+    """
+    Run a `class Solution` on the given cases in an isolated subprocess and measure it.
+    Each case is timed timeit-style (best of `repeat` rounds of `number` calls) and its peak allocation is
+    traced with tracemalloc. Returns a metrics dict with status "ok", "error" or "timeout".
+    method/annotations and bytecode (see solution_extract.normalize_solution and CodeCache) let the runner skip
+    parsing and compiling the code.
+    """
+    if not cases:
+        return {"status": "no_examples", "passed": 0, "total": 0}
+
+    job = {"code": code, "method": method, "annotations": annotations,
+           "cases": [{"args": case["args"]} for case in cases], "repeat": repeat, "number": number}
+    if bytecode is not None:
+        job["bytecode"] = base64.b64encode(bytecode).decode('ascii')
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            completed = subprocess.run(
+                [sys.executable, "-I", RUNNER_PATH],
+                input=json.dumps(job), capture_output=True, text=True, timeout=timeout, cwd=workdir,
+                env={"PATH": os.environ.get("PATH", ""), "PYTHONHASHSEED": "0"},
+                preexec_fn=_limit_resources(cpu_seconds or timeout, memory_bytes) if os.name == "posix" else None
+            )
+        except subprocess.TimeoutExpired:
+            return {"status": "timeout", "passed": 0, "total": len(cases), "error": f"Exceeded {timeout}s"}
+
+    try:
+        result = json.loads(completed.stdout)
+    except ValueError:
+        error = completed.stderr.strip().splitlines()[-1:] or [f"Runner exited with code {completed.returncode}"]
+        return {"status": "error", "passed": 0, "total": len(cases), "error": error[0]}
+    if "error" in result:
+        return {"status": "error", "passed": 0, "total": len(cases), "error": result["error"].strip().splitlines()[-1]}
+
+    passed = 0
+    case_metrics = []
+    errors = []
+    for case, case_result in zip(cases, result["cases"]):
+        if "error" in case_result:
+            errors.append(case_result["error"].strip().splitlines()[-1])
+            continue
+        passed += outputs_match(case_result["output"], case["expected"])
+        case_metrics.append(case_result)
+
+    metrics = {
+        "status": "ok" if case_metrics else "error",
+        "method": result["method"],
+        "passed": passed,
+        "total": len(cases),
+    }
+    if case_metrics:
+        metrics["runtime_ms"] = 1000 * sum(m["best_time"] for m in case_metrics) / len(case_metrics)
+        metrics["mean_runtime_ms"] = 1000 * sum(m["mean_time"] for m in case_metrics) / len(case_metrics)
+        metrics["peak_memory_kb"] = max(m["peak_memory"] for m in case_metrics) / 1024
+        metrics["max_rss_kb"] = result["max_rss_kb"]
+    if errors:
+        metrics["error"] = errors[0]
+    return metrics
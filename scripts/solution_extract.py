@@ -0,0 +1,178 @@
+import argparse
+import ast
+import hashlib
+import marshal
+import os
+import re
+import sys
+import textwrap
+import threading
+
+_FENCE_RE = re.compile(
+    r'^[ \t]*(?P<fence>`{3,}|~{3,})[ \t]*(?P<lang>[\w+-]*)[^\n]*\n(?P<body>.*?)^[ \t]*(?P=fence)[ \t]*$',
+    re.M | re.S
+)
+# An opening fence that is never closed, e.g. a response cut off by max_tokens
+_OPEN_FENCE_RE = re.compile(r'^[ \t]*(?:`{3,}|~{3,})[ \t]*(?P<lang>[\w+-]*)[^\n]*\n(?P<body>.*)\Z', re.M | re.S)
+_CODE_START_RE = re.compile(r'^(?:from\s+\w|import\s+\w|class\s+\w|def\s+\w|@\w)', re.M)
+
+
+def solution_hash(code):
+    """Identify a solution so that stored results are only reused for the exact same code."""
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+def _code_blocks(text):
+    """Return the (language, body) of every fenced block in text, including a trailing unclosed one."""
+    blocks = []
+    end = 0
+    for match in _FENCE_RE.finditer(text):
+        blocks.append((match.group('lang').lower(), match.group('body')))
+        end = match.end()
+    unclosed = _OPEN_FENCE_RE.search(text, end)
+    if unclosed:
+        blocks.append((unclosed.group('lang').lower(), unclosed.group('body')))
+    return blocks
+
+
+def _trim_to_code(text):
+    """
+    Cut prose before the first code-looking line and after the last line that still parses.
+    Returns (code, error) where error is None when the code parses.
+    """
+    code = textwrap.dedent(text).strip()
+    try:
+        ast.parse(code)
+        return code, None
+    except SyntaxError as e:
+        error = f"{type(e).__name__}: {e}"
+
+    start = _CODE_START_RE.search(code)
+    if not start:
+        return code, error
+    lines = code[start.start():].splitlines()
+    # Drop trailing lines one at a time, but never past the class definition itself
+    while lines and "class Solution" in "\n".join(lines):
+        candidate = "\n".join(lines).strip()
+        try:
+            ast.parse(candidate)
+            return candidate, None
+        except SyntaxError:
+            lines.pop()
+    return code, error
+
+
+def extract_code(text):
+    """
+    Extract the Python code of a `class Solution` from a model response. Fenced blocks are preferred (the last
+    one defining `class Solution`, then the last Python one), otherwise the whole response is used; surrounding
+    prose is trimmed. Returns (code, error), where error is None when the code parses.
+    """
+    blocks = _code_blocks(text or '')
+    solution_blocks = [body for _, body in blocks if "class Solution" in body]
+    python_blocks = [body for lang, body in blocks if lang in ('python', 'python3', 'py')]
+    if solution_blocks:
+        candidate = solution_blocks[-1]
+    elif python_blocks:
+        candidate = python_blocks[-1]
+    elif blocks:
+        candidate = max((body for _, body in blocks), key=len)
+    else:
+        candidate = text or ''
+    return _trim_to_code(candidate)
+
+
+def describe_solution(code):
+    """
+    Return the entry point of a `class Solution`: {"method", "signature", "annotations"}, or None if there is none.
+    The method is the first public one, as in solution_runner.find_method.
+    """
+    for node in ast.parse(code).body:
+        if isinstance(node, ast.ClassDef) and node.name == "Solution":
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and not item.name.startswith("_"):
+                    returns = f" -> {ast.unparse(item.returns)}" if item.returns else ""
+                    return {
+                        "method": item.name,
+                        "signature": f"{item.name}({ast.unparse(item.args)}){returns}",
+                        "annotations": [ast.unparse(arg.annotation) if arg.annotation else ""
+                                        for arg in item.args.args[1:]],
+                    }
+    return None
+
+
+def normalize_solution(text):
+    """
+    Run a raw LeetCode response through the extraction stage.
+    Returns (code, meta): the extracted code and {"valid", "solution_hash", "method", "signature", "annotations"}
+    or {"valid": False, "solution_hash", "error"} when no parseable `class Solution` was found.
+    """
+    code, error = extract_code(text)
+    meta = {"valid": False, "solution_hash": solution_hash(code)}
+    if error:
+        meta["error"] = error
+        return code, meta
+    entry_point = describe_solution(code)
+    if entry_point is None:
+        meta["error"] = "No `class Solution` entry-point method found."
+        return code, meta
+    meta.update(entry_point, valid=True)
+    return code, meta
+
+
+class CodeCache:
+    """
+    Marshalled code objects of compiled solutions, keyed by solution hash and interpreter version.
+    Entries are kept in memory and, when cache_dir is set, as files so that later runs skip compilation too.
+    The bytecode is passed to scripts/solution_runner.py, which runs on the same interpreter.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.{sys.implementation.cache_tag}.marshal")
+
+    def bytecode(self, code):
+        """Return marshal.dumps() of the compiled code, compiling it on a miss. Raises SyntaxError for invalid code."""
+        key = solution_hash(code)
+        with self._lock:
+            data = self._memory.get(key)
+        if data is None and self.cache_dir and os.path.exists(self._path(key)):
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        compiled = data is None
+        if compiled:
+            data = marshal.dumps(compile(code, "<solution>", "exec"))
+            if self.cache_dir:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, self._path(key))
+        with self._lock:
+            self._memory[key] = data
+            if compiled:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def stats(self):
+        return {"entries": len(self._memory), "hits": self.hits, "misses": self.misses}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize the stored LeetCode solutions of a dataset folder.")
+    parser.add_argument("--dataset-folder", default=None,
+                        help="Dataset folder (default: $PROBLEMSET_DATASET_FOLDER or the repository root).")
+    parser.add_argument("--models", nargs="*", default=None, help="Models to normalize (default: all).")
+    args = parser.parse_args()
+
+    from .data_manager import DatasetManager
+
+    DatasetManager(args.dataset_folder).normalize_solutions(models=args.models)
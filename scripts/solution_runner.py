@@ -0,0 +1,185 @@
+"""
+Subprocess entry point used by scripts/solution_benchmark.py to run a generated `class Solution` in isolation.
+Reads a JSON job from stdin and writes a JSON result to stdout. Only depends on the standard library.
+
+Job: {"code": str, "method": str or null, "annotations": [str] or null, "bytecode": base64 str (optional),
+      "cases": [{"args": [...]}], "repeat": int, "number": int}
+Result: {"method": str, "cases": [{"output": ..., "best_time": s, "mean_time": s, "peak_memory": bytes} or {"error": str}],
+         "max_rss_kb": int}
+"""
+import ast
+import base64
+import copy
+import io
+import json
+import marshal
+import sys
+import time
+import traceback
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Names LeetCode makes available to solutions without an explicit import
+PRELUDE = """
+from typing import *
+from collections import *
+from heapq import *
+from bisect import *
+from functools import *
+from itertools import *
+from math import inf, gcd, lcm, comb, perm, factorial, isqrt, sqrt, ceil, floor, log, log2
+import collections, heapq, bisect, functools, itertools, math, string, re, random, operator, sys
+
+class ListNode:
+    def __init__(self, val=0, next=None):
+        self.val = val
+        self.next = next
+
+class TreeNode:
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+"""
+
+
+def build_list(values, namespace):
+    head = None
+    for value in reversed(values):
+        head = namespace["ListNode"](value, head)
+    return head
+
+
+def build_tree(values, namespace):
+    """Build a binary tree from LeetCode's level-order list representation."""
+    if not values or values[0] is None:
+        return None
+    TreeNode = namespace["TreeNode"]
+    root = TreeNode(values[0])
+    queue = [root]
+    i = 1
+    for node in queue:
+        if i >= len(values):
+            break
+        if values[i] is not None:
+            node.left = TreeNode(values[i])
+            queue.append(node.left)
+        i += 1
+        if i < len(values) and values[i] is not None:
+            node.right = TreeNode(values[i])
+            queue.append(node.right)
+        i += 1
+    return root
+
+
+def to_plain(value, namespace):
+    """Convert ListNode/TreeNode results back to LeetCode's list representation."""
+    if isinstance(value, namespace["ListNode"]):
+        values = []
+        while value is not None:
+            values.append(value.val)
+            value = value.next
+        return values
+    if isinstance(value, namespace["TreeNode"]):
+        values, queue = [], [value]
+        for node in queue:
+            values.append(None if node is None else node.val)
+            if node is not None:
+                queue.extend([node.left, node.right])
+        while values and values[-1] is None:
+            values.pop()
+        return values
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def find_method(code, method):
+    """Return the entry-point method name and its parameter annotations (as source strings)."""
+    tree = ast.parse(code)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "Solution":
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and (item.name == method or (method is None and not item.name.startswith("_"))):
+                    annotations = [ast.unparse(arg.annotation) if arg.annotation else "" for arg in item.args.args[1:]]
+                    return item.name, annotations
+    raise ValueError("No `class Solution` entry-point method found.")
+
+
+def convert_args(args, annotations, namespace):
+    converted = []
+    for i, value in enumerate(args):
+        annotation = annotations[i] if i < len(annotations) else ""
+        if "ListNode" in annotation and isinstance(value, list):
+            value = build_list(value, namespace)
+        elif "TreeNode" in annotation and isinstance(value, list):
+            value = build_tree(value, namespace)
+        converted.append(value)
+    return converted
+
+
+def run(job):
+    sys.setrecursionlimit(10000)
+    namespace = {"__name__": "solution"}
+    exec(PRELUDE, namespace)
+    # The entry point and compiled code are reused when the caller already has them (see solution_extract.py)
+    if job.get("method") and job.get("annotations") is not None:
+        method_name, annotations = job["method"], job["annotations"]
+    else:
+        method_name, annotations = find_method(job["code"], job.get("method"))
+    if job.get("bytecode"):
+        code_object = marshal.loads(base64.b64decode(job["bytecode"]))
+    else:
+        code_object = compile(job["code"], "<solution>", "exec")
+    exec(code_object, namespace)
+    solution_class = namespace["Solution"]
+
+    results = []
+    for case in job["cases"]:
+        try:
+            args = convert_args(case["args"], annotations, namespace)
+            # First call doubles as the correctness check and the tracemalloc peak-memory measurement
+            tracemalloc.start()
+            output = getattr(solution_class(), method_name)(*copy.deepcopy(args))
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            times = []
+            for _ in range(job["repeat"]):
+                elapsed = 0.0
+                for _ in range(job["number"]):
+                    call_args = copy.deepcopy(args)
+                    instance = solution_class()
+                    start = time.perf_counter()
+                    getattr(instance, method_name)(*call_args)
+                    elapsed += time.perf_counter() - start
+                times.append(elapsed / job["number"])
+            results.append({
+                "output": to_plain(output, namespace),
+                "best_time": min(times),
+                "mean_time": sum(times) / len(times),
+                "peak_memory": peak_memory
+            })
+        except Exception:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            results.append({"error": traceback.format_exc(limit=3)})
+
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    return {"method": method_name, "cases": results, "max_rss_kb": max_rss_kb}
+
+
+if __name__ == "__main__":
+    job = json.load(sys.stdin)
+    # Anything the solution prints must not end up in the JSON result
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        result = run(job)
+    except Exception:
+        result = {"error": traceback.format_exc(limit=3)}
+    sys.stdout = stdout
+    sys.stdout.write(json.dumps(result, default=repr))
@@ -0,0 +1,421 @@
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+
+DATASET_FILES = {
+    "math": "math_problems.json",
+    "leetcode": "leetcode_problems.json",
+}
+
+
+def _file_mode(path):
+    """The permissions to give path: those of the existing file, or the umask default of a new one."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_json_atomic(path, data):
+    """Write data to a temporary file next to path and rename it into place, so a crash never truncates the dataset."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600, which would otherwise replace the dataset's permissions
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def apply_change(dataset, change):
+    """
+    Apply a single mutation record to a dataset dict. Records have the form:
+        {"op": "add_problem", "id": ..., "data": {...}}
+        {"op": "remove_problem", "id": ...}
+        {"op": "store_solution", "id": ..., "model": ..., "data": {...}}
+        {"op": "store_eval", "id": ..., "model": ..., "data": {...}}
+        {"op": "update_solution", "id": ..., "model": ..., "data": {...}}
+        {"op": "update_problem", "id": ..., "data": {...}}
+    store_solution replaces a model's entry, while store_eval and update_solution merge into it.
+    update_problem merges fields such as "tags" into the problem entry itself.
+    """
+    op = change["op"]
+    problem_id = str(change["id"])
+    if op == "add_problem":
+        dataset[problem_id] = change["data"]
+    elif op == "remove_problem":
+        dataset.pop(problem_id, None)
+    elif op == "store_solution":
+        dataset[problem_id][change["model"]] = change["data"]
+    elif op in ("store_eval", "update_solution"):
+        dataset[problem_id].setdefault(change["model"], {}).update(change["data"])
+    elif op == "update_problem":
+        dataset[problem_id].update(change["data"])
+    else:
+        raise ValueError(f"Unknown journal operation '{op}'.")
+
+
+class JsonFileStorage:
+    """Stores each dataset as a single JSON file that is rewritten in full on every save."""
+
+    def __init__(self, dataset_folder):
+        self.dataset_folder = dataset_folder
+
+    def dataset_path(self, dataset_type):
+        """Return the snapshot file path of the specified dataset (either 'math' or 'leetcode')."""
+        if dataset_type not in DATASET_FILES:
+            raise ValueError("Invalid dataset_type. Choose 'math' or 'leetcode'.")
+        return os.path.join(self.dataset_folder, DATASET_FILES[dataset_type])
+
+    def index_path(self, dataset_type):
+        """Return the path of the lookup index kept next to the specified dataset."""
+        return os.path.splitext(self.dataset_path(dataset_type))[0] + '.index.json'
+
+    def _files(self, dataset_type):
+        return [self.dataset_path(dataset_type)]
+
+    def fingerprint(self, dataset_type):
+        """Return the (mtime_ns, size) of every file backing the dataset, used to detect stale indexes."""
+        fingerprint = []
+        for path in self._files(dataset_type):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                fingerprint.append([stat.st_mtime_ns, stat.st_size])
+            else:
+                fingerprint.append(None)
+        return fingerprint
+
+    def initialize(self, dataset_type):
+        """If the dataset file does not exist, create it with an empty structure."""
+        path = self.dataset_path(dataset_type)
+        if not os.path.exists(path):
+            write_json_atomic(path, {})
+
+    def load(self, dataset_type):
+        """Load the full dataset."""
+        with open(self.dataset_path(dataset_type), 'r') as f:
+            return json.load(f)
+
+    def save(self, dataset_type, dataset, changes):
+        """Persist the dataset after the given mutation records have been applied to it."""
+        if not changes:
+            return
+        write_json_atomic(self.dataset_path(dataset_type), dataset)
+
+    def replace(self, dataset_type, dataset):
+        """Overwrite the stored dataset with the given one."""
+        write_json_atomic(self.dataset_path(dataset_type), dataset)
+
+    def compact(self, dataset_type):
+        """Nothing to fold back: the snapshot is always up to date."""
+
+
+class JournalStorage(JsonFileStorage):
+    """
+    Stores each dataset as a JSON snapshot plus an append-only JSON-lines journal of mutations.
+    Saving appends only the changed records, loading replays the journal over the snapshot,
+    and compact() folds the journal back into the snapshot file.
+    """
+
+    def journal_path(self, dataset_type):
+        """Return the journal file path of the specified dataset."""
+        return os.path.splitext(self.dataset_path(dataset_type))[0] + '.journal.jsonl'
+
+    def _files(self, dataset_type):
+        return [self.dataset_path(dataset_type), self.journal_path(dataset_type)]
+
+    def load(self, dataset_type):
+        """Load the snapshot and replay any journaled mutations over it."""
+        dataset = super().load(dataset_type)
+        journal_path = self.journal_path(dataset_type)
+        if not os.path.exists(journal_path):
+            return dataset
+        with open(journal_path, 'r') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append can leave a partial last record; everything before it is intact
+                    print(f"Skipping unreadable record on line {line_number} of {journal_path}.")
+                    continue
+                apply_change(dataset, change)
+        return dataset
+
+    def save(self, dataset_type, dataset, changes):
+        """Append the mutation records to the journal; the snapshot is left untouched."""
+        if not changes:
+            return
+        journal_path = self.journal_path(dataset_type)
+        # Terminate a partial record left by a crash so the new records start on their own line
+        needs_newline = False
+        if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+            with open(journal_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        with open(journal_path, 'a') as f:
+            if needs_newline:
+                f.write('\n')
+            for change in changes:
+                f.write(json.dumps(change) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, dataset_type):
+        """Fold the journal into the snapshot file and start a new, empty journal."""
+        journal_path = self.journal_path(dataset_type)
+        if not os.path.exists(journal_path):
+            return
+        write_json_atomic(self.dataset_path(dataset_type), self.load(dataset_type))
+        os.remove(journal_path)
+
+    def replace(self, dataset_type, dataset):
+        """Overwrite the snapshot with the given dataset and discard the journal."""
+        super().replace(dataset_type, dataset)
+        if os.path.exists(self.journal_path(dataset_type)):
+            os.remove(self.journal_path(dataset_type))
+
+
+# Large text fields that SqliteStorage keeps out of the eagerly loaded metadata
+PROBLEM_TEXT_FIELDS = ("problem",)
+MODEL_TEXT_FIELDS = ("solution",)
+
+class _NotLoaded:
+    def __repr__(self):
+        return "<not loaded>"
+
+
+_NOT_LOADED = _NotLoaded()
+
+
+class LazyEntry(dict):
+    """
+    A dataset entry whose large text fields are fetched on first access. Unloaded keys are present (so `in`,
+    iteration and len behave normally) but hold a placeholder until read through [], get(), items() or values().
+    """
+
+    def __init__(self, data, loader, lazy_fields=(), lengths=None):
+        super().__init__(data)
+        for field in lazy_fields:
+            dict.__setitem__(self, field, _NOT_LOADED)
+        self._loader = loader
+        self._lengths = lengths or {}
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value is _NOT_LOADED:
+            value = self._loader(key)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __iter__(self):
+        # Overriding __iter__ makes dict(entry) and {**entry} go through __getitem__ instead of copying placeholders
+        return dict.__iter__(self)
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    __hash__ = None
+
+    def is_loaded(self, key):
+        return dict.get(self, key) is not _NOT_LOADED
+
+    def text_length(self, key):
+        """Return the length of a text field without loading it."""
+        if not self.is_loaded(key):
+            return self._lengths.get(key, 0)
+        return len(dict.__getitem__(self, key) or "")
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            dict.__setitem__(self, key, default)
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def items(self):
+        return [(key, self[key]) for key in dict.keys(self)]
+
+    def values(self):
+        return [self[key] for key in dict.keys(self)]
+
+    def copy(self):
+        return dict(self.items())
+
+
+class SqliteStorage(JsonFileStorage):
+    """
+    Stores both datasets in one SQLite file. Problem metadata and metrics are kept as a small JSON column and
+    loaded eagerly; problem statements and model solutions live in a separate text table and are only read
+    when an entry's "problem" or "solution" is accessed (see LazyEntry). The file is memory-mapped, and
+    saving only rewrites the rows of problems named in the mutation records.
+    """
+
+    def __init__(self, dataset_folder, db_name="problems.sqlite", mmap_size=256 * 1024 ** 2):
+        super().__init__(dataset_folder)
+        self.db_path = os.path.join(dataset_folder, db_name)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS problems (dataset TEXT, id TEXT, meta TEXT NOT NULL, PRIMARY KEY (dataset, id));"
+            "CREATE TABLE IF NOT EXISTS texts (dataset TEXT, id TEXT, field TEXT, length INTEGER NOT NULL, "
+            "body TEXT NOT NULL, PRIMARY KEY (dataset, id, field));"
+            "CREATE TABLE IF NOT EXISTS versions (dataset TEXT PRIMARY KEY, version INTEGER NOT NULL);"
+        )
+        self._conn.commit()
+
+    def _files(self, dataset_type):
+        return [self.db_path]
+
+    def fingerprint(self, dataset_type):
+        """Each save bumps a per-dataset version, which changes the fingerprint."""
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM versions WHERE dataset = ?", (dataset_type,)).fetchone()
+        return ["sqlite", self.db_path, row[0] if row else 0]
+
+    def initialize(self, dataset_type):
+        """Tables are created on open; only validate the dataset type."""
+        self.dataset_path(dataset_type)
+
+    def _load_text(self, dataset_type, problem_id, field):
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM texts WHERE dataset = ? AND id = ? AND field = ?",
+                                     (dataset_type, problem_id, field)).fetchone()
+        return row[0] if row else None
+
+    def load(self, dataset_type):
+        """Load every entry's metadata and metrics; problem and solution texts load lazily on access."""
+        self.dataset_path(dataset_type)
+        with self._lock:
+            rows = self._conn.execute("SELECT id, meta FROM problems WHERE dataset = ? ORDER BY CAST(id AS INTEGER)",
+                                      (dataset_type,)).fetchall()
+            text_rows = self._conn.execute("SELECT id, field, length FROM texts WHERE dataset = ?",
+                                           (dataset_type,)).fetchall()
+        lengths = {}
+        for problem_id, field, length in text_rows:
+            lengths.setdefault(problem_id, {})[field] = length
+
+        dataset = {}
+        for problem_id, meta in rows:
+            entry = json.loads(meta)
+            problem_lengths = lengths.get(problem_id, {})
+            for key, value in entry.items():
+                if isinstance(value, dict):
+                    fields = [f"{key}/{field}" for field in MODEL_TEXT_FIELDS if f"{key}/{field}" in problem_lengths]
+                    entry[key] = LazyEntry(
+                        value,
+                        lambda field, problem_id=problem_id, key=key: self._load_text(dataset_type, problem_id, f"{key}/{field}"),
+                        [field.split('/', 1)[1] for field in fields],
+                        {field.split('/', 1)[1]: problem_lengths[field] for field in fields}
+                    )
+            fields = [field for field in PROBLEM_TEXT_FIELDS if field in problem_lengths]
+            dataset[problem_id] = LazyEntry(
+                entry,
+                lambda field, problem_id=problem_id: self._load_text(dataset_type, problem_id, field),
+                fields,
+                {field: problem_lengths[field] for field in fields}
+            )
+        return dataset
+
+    def _write_entry(self, dataset_type, problem_id, entry):
+        """
+        Upsert one entry's metadata and any text fields that were loaded or set since it was read, and drop the
+        stored texts of fields the entry no longer has (e.g. a removed model entry).
+        """
+        meta = {}
+        texts = {}
+        fields = []
+        for key in entry:
+            if key in PROBLEM_TEXT_FIELDS:
+                fields.append(key)
+                if not isinstance(entry, LazyEntry) or entry.is_loaded(key):
+                    texts[key] = entry[key]
+                continue
+            value = entry[key]
+            if isinstance(value, dict):
+                meta[key] = {}
+                for model_key in value:
+                    if model_key in MODEL_TEXT_FIELDS:
+                        fields.append(f"{key}/{model_key}")
+                        if not isinstance(value, LazyEntry) or value.is_loaded(model_key):
+                            texts[f"{key}/{model_key}"] = value[model_key]
+                    else:
+                        meta[key][model_key] = value[model_key]
+            else:
+                meta[key] = value
+        # Unloaded texts are still part of the entry, so only the fields that are gone are deleted
+        self._conn.execute(
+            f"DELETE FROM texts WHERE dataset = ? AND id = ? AND field NOT IN ({', '.join('?' * len(fields))})",
+            (dataset_type, problem_id, *fields)
+        )
+        self._conn.execute("INSERT OR REPLACE INTO problems (dataset, id, meta) VALUES (?, ?, ?)",
+                           (dataset_type, problem_id, json.dumps(meta)))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO texts (dataset, id, field, length, body) VALUES (?, ?, ?, ?, ?)",
+            [(dataset_type, problem_id, field, len(body or ""), body or "") for field, body in texts.items()]
+        )
+
+    def _bump_version(self, dataset_type):
+        self._conn.execute(
+            "INSERT INTO versions (dataset, version) VALUES (?, 1) "
+            "ON CONFLICT(dataset) DO UPDATE SET version = version + 1", (dataset_type,)
+        )
+
+    def save(self, dataset_type, dataset, changes):
+        """Rewrite only the rows of problems touched by the mutation records."""
+        if not changes:
+            return
+        problem_ids = list(dict.fromkeys(str(change["id"]) for change in changes))
+        with self._lock, self._conn:
+            for problem_id in problem_ids:
+                if problem_id in dataset:
+                    self._write_entry(dataset_type, problem_id, dataset[problem_id])
+                else:
+                    self._conn.execute("DELETE FROM problems WHERE dataset = ? AND id = ?", (dataset_type, problem_id))
+                    self._conn.execute("DELETE FROM texts WHERE dataset = ? AND id = ?", (dataset_type, problem_id))
+            self._bump_version(dataset_type)
+
+    def replace(self, dataset_type, dataset):
+        """Overwrite the stored dataset with the given one."""
+        self.dataset_path(dataset_type)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM problems WHERE dataset = ?", (dataset_type,))
+            self._conn.execute("DELETE FROM texts WHERE dataset = ?", (dataset_type,))
+            for problem_id, entry in dataset.items():
+                self._write_entry(dataset_type, str(problem_id), entry)
+            self._bump_version(dataset_type)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def convert_storage(source, target, dataset_types=("math", "leetcode")):
+    """
+    Copy datasets from one storage backend to another, e.g. import the JSON files into SQLite:
+        convert_storage(JsonFileStorage(folder), SqliteStorage(folder))
+    or export them back with the arguments swapped.
+    """
+    for dataset_type in dataset_types:
+        target.replace(dataset_type, source.load(dataset_type))
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# Make the scripts package importable when pytest is run as `pytest` rather than `python -m pytest`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def dataset_folder(tmp_path):
+    """An empty dataset folder; DatasetManager creates the dataset files in it."""
+    return str(tmp_path)
@@ -0,0 +1,35 @@
+from scripts.data_manager import DatasetManager
+
+
+def add_evaluated(manager, problem_id, problem, tags, beats):
+    manager.add_problems([{"title_slug": f"p{problem_id}", "problem": problem, "tags": tags}], "leetcode")
+    for model_name, (runtime, memory) in beats.items():
+        manager._save_dataset("leetcode", manager._load_dataset("leetcode"), [
+            {"op": "store_solution", "id": problem_id, "model": model_name, "data": {"solution": "class Solution: pass"}}
+        ])
+        manager.eval(problem_id, model_name, "leetcode", runtime_beats=runtime, memory_beats=memory, feedback="")
+
+
+def analyses(manager):
+    return (manager.summary("leetcode"),
+            manager.compare("a", "b", "leetcode", by="tag"),
+            manager.compare("a", "b", "leetcode", metric="runtime_beats", by="length"))
+
+
+def test_incremental_refresh_matches_a_fresh_table(dataset_folder):
+    manager = DatasetManager(dataset_folder)
+    add_evaluated(manager, "1", "Short problem", ["array"], {"a": (10, 20), "b": (30, 40)})
+    add_evaluated(manager, "2", "A somewhat longer problem statement", ["graph"], {"a": (50, 60), "b": (20, 10)})
+    add_evaluated(manager, "3", "The longest problem statement of them all", ["array", "graph"],
+                  {"a": (70, 80), "b": (90, 95)})
+    analyses(manager)
+    table = manager._results_tables["leetcode"]
+
+    manager.eval("1", "a", "leetcode", runtime_beats=99, memory_beats=1, feedback="")  # store_eval
+    add_evaluated(manager, "4", "Another problem", ["string"], {"a": (5, 5), "b": (6, 6)})  # add_problem
+    manager.remove_problem("2", "leetcode")
+
+    assert analyses(manager) == analyses(DatasetManager(dataset_folder))
+    # The table was refreshed in place rather than rebuilt
+    assert manager._results_tables["leetcode"] is table
+    assert table.ids == ["1", "3", "4"]
@@ -0,0 +1,45 @@
+from scripts.benchmark_scheduler import BenchmarkScheduler
+
+CODE = "class Solution:\n    def add(self, a, b):\n        return a + b"
+CASES = [{"args": [1, 2], "expected": 3}, {"args": [5, 5], "expected": 10}]
+
+
+def jobs():
+    return [{"problem_id": "1", "model": "a", "code": CODE, "cases": CASES},
+            {"problem_id": "2", "model": "a", "code": CODE.replace("a + b", "b + a"), "cases": CASES}]
+
+
+def stored_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_rerun_reuses_results_with_the_same_settings(tmp_path, capsys):
+    path = str(tmp_path / "results.jsonl")
+    results = BenchmarkScheduler(path, max_workers=2, repeat=1, number=1).run(jobs())
+    assert [results[(problem_id, "a")]["passed"] for problem_id in ("1", "2")] == [2, 2]
+    assert len(stored_lines(path)) == 2
+
+    capsys.readouterr()
+    assert BenchmarkScheduler(path, max_workers=2, repeat=1, number=1).run(jobs()) == results
+    assert "Reusing 2 stored benchmark results; 0 jobs left to run." in capsys.readouterr().out
+    assert len(stored_lines(path)) == 2
+
+    # Other measurement settings or an edited solution are benchmarked again
+    changed = jobs()
+    changed[1]["code"] += "\n"
+    BenchmarkScheduler(path, max_workers=2, repeat=2, number=1).run(changed)
+    assert len(stored_lines(path)) == 4
+    capsys.readouterr()
+    BenchmarkScheduler(path, max_workers=2, repeat=2, number=1).run(changed)
+    assert "Reusing 2 stored benchmark results; 0 jobs left to run." in capsys.readouterr().out
+
+
+def test_executor_failures_are_returned_but_not_stored(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    # A lambda cannot be pickled for the worker, so the job fails before it reaches benchmark_solution
+    job = dict(jobs()[0], annotations=lambda: None)
+    results = BenchmarkScheduler(path, max_workers=1, repeat=1, number=1).run([job, jobs()[1]])
+    assert results[("1", "a")]["transient"] is True
+    assert results[("2", "a")]["passed"] == 2
+    assert len(stored_lines(path)) == 1
@@ -0,0 +1,26 @@
+import pytest
+
+from scripts.__main__ import main
+
+
+def run(dataset_folder, *argv):
+    return main(["--dataset-folder", dataset_folder, *argv])
+
+
+def test_exit_status(dataset_folder):
+    assert run(dataset_folder, "add", "Prove that 1 + 1 = 2.") == 0
+    assert run(dataset_folder, "add", "Prove that 1 + 1 = 2.") == 1
+    assert run(dataset_folder, "remove", "1") == 0
+    assert run(dataset_folder, "remove", "1") == 1
+    assert run(dataset_folder, "stats") == 0
+
+
+@pytest.mark.parametrize("argv", [
+    ["stats", "--metric", "weighted_score"],
+    ["stats", "--dataset-type", "leetcode", "--by", "tag"],
+    ["stats", "--compare", "gpt-4o", "o1-preview", "--metric", "bogus"],
+])
+def test_invalid_stats_arguments(dataset_folder, argv):
+    with pytest.raises(SystemExit) as exit_info:
+        run(dataset_folder, *argv)
+    assert exit_info.value.code == 2
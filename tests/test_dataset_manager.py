@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from scripts.data_manager import DatasetManager
+from scripts.leetcode_fixture_server import LeetCodeFixtureServer
+from scripts.model_registry import FakeProvider, ModelRegistry
+from scripts.storage import JournalStorage
+
+SOLUTION = "```python\nclass Solution:\n    def solve(self, nums):\n        return sum(nums)\n```"
+
+
+def fake_registry(responder):
+    registry = ModelRegistry(default_provider="fake")
+    registry.register_provider(FakeProvider(responder=responder))
+    registry.register_model("fake", "fake")
+    return registry
+
+
+def count_saves(monkeypatch, manager):
+    """Record the mutation records of every storage save."""
+    saves = []
+    save = manager.storage.save
+
+    def spy(dataset_type, dataset, changes):
+        saves.append(list(changes))
+        return save(dataset_type, dataset, changes)
+
+    monkeypatch.setattr(manager.storage, "save", spy)
+    return saves
+
+
+def test_prompt_llm_batch_retries_and_saves_once(monkeypatch, dataset_folder):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    lock = threading.Lock()
+    calls = []
+
+    def responder(model, messages):
+        with lock:
+            calls.append(messages[-1]["content"])
+            first = calls.count(messages[-1]["content"]) == 1
+        if first and messages[-1]["content"] == "Problem one":
+            request = httpx.Request("POST", "fake://fake/chat/completions")
+            raise openai.RateLimitError("Rate limited", response=httpx.Response(429, request=request), body=None)
+        return SOLUTION
+
+    manager = DatasetManager(dataset_folder, registry=fake_registry(responder))
+    manager.add_problems([{"title_slug": "one", "problem": "Problem one"},
+                          {"title_slug": "two", "problem": "Problem two"}], dataset_type="leetcode")
+    saves = count_saves(monkeypatch, manager)
+
+    results = manager.prompt_llm_batch(None, ["1", "2"], models=["fake"], dataset_type="leetcode")
+
+    assert set(results) == {("1", "fake"), ("2", "fake")}
+    assert calls.count("Problem one") == 2
+    assert len(saves) == 1 and len(saves[0]) == 2
+    dataset = DatasetManager(dataset_folder)._load_dataset("leetcode")
+    assert dataset["1"]["fake"]["generation"]["attempts"] == 2
+    assert dataset["2"]["fake"]["generation"]["attempts"] == 1
+    assert dataset["1"]["fake"]["solution_meta"]["method"] == "solve"
+
+
+def test_journal_replay_and_compact(dataset_folder):
+    manager = DatasetManager(dataset_folder, storage=JournalStorage(dataset_folder))
+    manager.add_problem("Prove that the sample mean is unbiased.", "math")
+    manager.add_problem("Find the MLE of a Poisson rate.", "math")
+    manager.remove_problem("1", "math")
+    manager._save_dataset("math", manager._load_dataset("math"),
+                          [{"op": "store_solution", "id": "2", "model": "fake", "data": {"solution": "lambda = mean"}}])
+    manager.eval("2", "fake", "math", correctness_final=5, correctness_steps=4, clarity_explanation=5,
+                 completeness=4, appropriate_methods=5, feedback="")
+
+    # The snapshot is untouched and every change is replayed from the journal
+    storage = manager.storage
+    with open(storage.dataset_path("math")) as f:
+        assert json.load(f) == {}
+    replayed = JournalStorage(dataset_folder).load("math")
+    assert list(replayed) == ["2"]
+    assert replayed["2"]["fake"]["solution"] == "lambda = mean"
+    assert replayed["2"]["fake"]["weighted_score"] == pytest.approx(4.55)
+
+    manager.compact()
+    assert not os.path.exists(storage.journal_path("math"))
+    with open(storage.dataset_path("math")) as f:
+        assert json.load(f) == replayed
+    assert JournalStorage(dataset_folder).load("math") == replayed
+
+
+def test_eval_many_validates_every_row_before_storing(dataset_folder):
+    manager = DatasetManager(dataset_folder)
+    manager.add_problems([{"title_slug": "one", "problem": "Problem one"},
+                          {"title_slug": "two", "problem": "Problem two"}], dataset_type="leetcode")
+    dataset = manager._load_dataset("leetcode")
+    manager._save_dataset("leetcode", dataset, [
+        {"op": "store_solution", "id": problem_id, "model": "fake", "data": {"solution": "class Solution: pass"}}
+        for problem_id in ("1", "2")
+    ])
+    evaluations = [
+        {"problem_id": "1", "model_name": "fake", "runtime_beats": "80", "memory_beats": "60"},
+        {"problem_id": "2", "model_name": "fake", "runtime_beats": 120, "memory_beats": 50},
+        {"problem_id": "2", "model_name": "other", "runtime_beats": 50, "memory_beats": "n/a"},
+        {"problem_id": "3", "model_name": "fake", "runtime_beats": 50, "memory_beats": 50},
+    ]
+
+    result = manager.eval_many(evaluations, "leetcode")
+    assert result["stored"] == 0
+    assert [i for i, _ in result["errors"]] == [1, 2, 2, 3]
+    assert "runtime_beats=120 is outside 0-100" in result["errors"][0][1]
+    assert "runtime_beats" not in DatasetManager(dataset_folder)._load_dataset("leetcode")["1"]["fake"]
+
+    result = manager.eval_many(evaluations, "leetcode", skip_invalid=True)
+    assert result["stored"] == 1
+    stored = DatasetManager(dataset_folder)._load_dataset("leetcode")
+    assert stored["1"]["fake"]["weighted_average"] == pytest.approx(0.6 * 80 + 0.4 * 60)
+    assert "runtime_beats" not in stored["2"]["fake"]
+
+
+def write_fixture(fixture_dir, kind, key, data):
+    os.makedirs(os.path.join(fixture_dir, kind), exist_ok=True)
+    with open(os.path.join(fixture_dir, kind, f"{key}.json"), 'w') as f:
+        json.dump(data, f)
+
+
+def test_ingest_from_fixture_server(tmp_path, dataset_folder):
+    fixture_dir = str(tmp_path / "fixtures")
+    listings = {"array": [("hard-a", "Hard"), ("shared", "Hard"), ("easy-a", "Easy")],
+                "graph": [("shared", "Hard"), ("copy-of-a", "Hard")]}
+    for tag, problems in listings.items():
+        write_fixture(fixture_dir, "problems", tag,
+                      {"problemsetQuestionList": [{"titleSlug": slug, "difficulty": difficulty}
+                                                  for slug, difficulty in problems]})
+    for slug, question, tags in [("hard-a", "<p>Hard A</p>", ["array"]), ("shared", "<p>Shared</p>", ["array", "graph"]),
+                                 ("easy-a", "<p>Easy A</p>", ["array"]), ("copy-of-a", "<p>Hard A</p>", ["graph"])]:
+        write_fixture(fixture_dir, "select", slug,
+                      {"question": question, "exampleTestcases": "", "topicTags": [{"slug": tag} for tag in tags]})
+
+    manager = DatasetManager(dataset_folder)
+    with LeetCodeFixtureServer(fixture_dir) as server:
+        new_ids = manager.query_leetcode_problems(["array", "graph"], max_new=10, api_url=server.url)
+        # Every Hard problem is now known, by title_slug or by text
+        assert manager.query_leetcode_problems(["array", "graph"], max_new=10, api_url=server.url) == []
+
+    dataset = DatasetManager(dataset_folder)._load_dataset("leetcode")
+    assert len(new_ids) == 2
+    # hard-a and copy-of-a share a statement, so only the first one drawn is added
+    assert sorted(entry["problem"] for entry in dataset.values()) == ["<p>Hard A</p>", "<p>Shared</p>"]
+    tags = {entry["title_slug"]: entry["tags"] for entry in dataset.values()}
+    assert tags.pop("shared") == ["array", "graph"]
+    assert list(tags.items()) in ([("hard-a", ["array"])], [("copy-of-a", ["graph"])])
+
+
+
+def test_add_single_problem_by_title_slug(tmp_path, dataset_folder):
+    fixture_dir = str(tmp_path / "fixtures")
+    write_fixture(fixture_dir, "select", "hard-a",
+                  {"question": "<p>Hard A</p>", "exampleTestcases": "[1,2]", "topicTags": [{"slug": "array"}]})
+
+    manager = DatasetManager(dataset_folder)
+    with LeetCodeFixtureServer(fixture_dir) as server:
+        assert manager.get_problem_description_and_add("hard-a", api_url=server.url) == "1"
+        assert manager.get_problem_description_and_add("hard-a", api_url=server.url) is None
+        assert manager.get_problem_description_and_add("missing", api_url=server.url) is None
+
+    assert DatasetManager(dataset_folder)._load_dataset("leetcode") == {
+        "1": {"title_slug": "hard-a", "problem": "<p>Hard A</p>[1,2]", "tags": ["array"]}
+    }
+
+def test_saves_without_changes_leave_the_dataset_file_alone(dataset_folder):
+    manager = DatasetManager(dataset_folder)
+    manager.add_problem("Problem one", "leetcode", title_slug="one")
+    path = manager.storage.dataset_path("leetcode")
+    before = os.stat(path).st_mtime_ns
+    time.sleep(0.01)
+    assert manager.add_problems([], "leetcode") == []
+    assert manager.add_problems([{"title_slug": "copy", "problem": "Problem one"}], "leetcode") == []
+    assert os.stat(path).st_mtime_ns == before
@@ -0,0 +1,57 @@
+import os
+import time
+
+from scripts.data_manager import DatasetManager
+from scripts.llm_cache import LLMCache
+from scripts.model_registry import FakeProvider, ModelRegistry
+
+
+def test_hit_miss_counters(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    key = LLMCache.make_key("fake", "fake://fake/", "context", "problem", 100, 0)
+    assert cache.get(key) is None
+    cache.put(key, "answer", model="fake")
+    assert cache.get(key) == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert LLMCache.make_key("fake", "fake://fake/", "context", "problem", 200, 0) != key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("a", "A")
+    time.sleep(0.01)
+    cache.put("b", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"  # a is now more recently used than b
+    time.sleep(0.01)
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_age=0.01)
+    cache.put("a", "A")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_only_complete_responses_are_cached(tmp_path, dataset_folder):
+    registry = ModelRegistry(default_provider="fake")
+    provider = registry.register_provider(FakeProvider(finish_reason="length"))
+    registry.register_model("fake", "fake")
+    manager = DatasetManager(dataset_folder, registry=registry,
+                             llm_cache=LLMCache(os.path.join(str(tmp_path), "cache.sqlite")))
+    manager.add_problem("Problem one", "leetcode", title_slug="one")
+
+    manager.prompt_llm(None, "1", "fake", "leetcode")
+    manager.prompt_llm(None, "1", "fake", "leetcode")
+    # Both truncated responses went to the model; neither was cached
+    assert next(provider.calls) == 3
+    assert manager.llm_cache.hits == 0
+
+    provider.finish_reason = "stop"
+    manager.prompt_llm(None, "1", "fake", "leetcode")
+    manager.prompt_llm(None, "1", "fake", "leetcode")
+    assert next(provider.calls) == 5
+    assert manager.llm_cache.hits == 1
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from scripts.model_registry import DEFAULT_LIMITS, FakeProvider, Provider, TokenBucket, default_registry
+
+
+def test_token_bucket_makes_callers_wait_for_refills():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.append(bucket.acquire())) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Two calls fit in the bucket; the other four wait for 1/20 s refills each
+    assert time.monotonic() - start >= 0.19
+    assert sorted(waits)[:2] == [0.0, 0.0]
+
+
+def test_token_bucket_refunds_unused_tokens():
+    bucket = TokenBucket(rate=1, capacity=100)
+    assert bucket.acquire(100) == 0.0
+    bucket.refund(60)
+    assert bucket.acquire(50) == 0.0
+
+
+def test_pause_holds_back_every_caller():
+    provider = Provider("p", requests_per_minute=60_000)
+    provider.pause(0.2)
+    start = time.monotonic()
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.append(provider.acquire(0))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start >= 0.15
+    assert all(wait >= 0.15 for wait in waits)
+
+
+def test_token_limit_throttles_fake_calls():
+    provider = FakeProvider(tokens_per_minute=600)  # 10 tokens per second
+    assert provider.acquire(600) == 0.0
+    provider.record_usage(600, 5)  # 5 tokens used, 595 given back
+    assert provider.acquire(590) == 0.0
+    assert provider.acquire(10) >= 0.4
+
+
+def test_default_limits_come_from_the_environment(monkeypatch):
+    for name in DEFAULT_LIMITS:
+        monkeypatch.delenv(name, raising=False)
+    registry = default_registry()
+    assert registry.providers["openai"].request_bucket.capacity == 500
+    assert registry.providers["openai"].token_bucket.capacity == 150_000
+    assert registry.providers["openrouter"].token_bucket is None
+
+    monkeypatch.setenv("OPENAI_TOKENS_PER_MINUTE", "0")
+    monkeypatch.setenv("OPENROUTER_REQUESTS_PER_MINUTE", "50")
+    registry = default_registry()
+    assert registry.providers["openai"].token_bucket is None
+    assert registry.providers["openrouter"].request_bucket.capacity == 50
+
+    monkeypatch.setenv("OPENAI_REQUESTS_PER_MINUTE", "lots")
+    with pytest.raises(ValueError):
+        default_registry()
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from scripts.data_manager import DatasetManager
+from scripts.solution_extract import CodeCache, extract_code, normalize_solution, solution_hash
+
+CODE = "class Solution:\n    def twoSum(self, nums: List[int], target: int) -> List[int]:\n        return [0, 1]"
+
+
+@pytest.mark.parametrize("response", [
+    f"```python\n{CODE}\n```",
+    f"~~~python3\n{CODE}\n~~~",
+    f"````\n{CODE}\n````",
+    f"Here is my approach.\n\n```python\n{CODE}\n```\n\nThis runs in O(n) time.",
+    f"Sketch:\n```python\ndef helper(): pass\n```\nFinal answer:\n```python\n{CODE}\n```",
+    f"The solution is:\n\n{CODE}\n\nThe complexity is O(n).",
+    f"```python\n{CODE}\n",  # Unclosed fence from a response cut off by max_tokens
+    f"   ```python\n    {CODE.replace(chr(10), chr(10) + '    ')}\n   ```",
+])
+def test_extract_code(response):
+    assert extract_code(response) == (CODE, None)
+
+
+def test_truncated_code_is_trimmed_to_what_parses():
+    code, error = extract_code(f"```python\n{CODE}\n    def other(self, x):\n        return (x +")
+    assert error is None and code == CODE
+
+
+def test_normalize_solution_records_the_entry_point():
+    code, meta = normalize_solution(f"```python\nfrom typing import List\n\n{CODE}\n```")
+    assert meta["valid"] and meta["solution_hash"] == solution_hash(code)
+    assert meta["method"] == "twoSum"
+    assert meta["signature"] == "twoSum(self, nums: List[int], target: int) -> List[int]"
+    assert meta["annotations"] == ["List[int]", "int"]
+
+
+@pytest.mark.parametrize("response", [
+    "```sql\nSELECT name FROM Employee WHERE salary > 100;\n```",
+    "```python\ndef two_sum(nums, target):\n    return [0, 1]\n```",
+    "```python\nclass Solution:\n    def broken(self:\n```",
+])
+def test_normalize_solution_without_a_class_solution(response):
+    _, meta = normalize_solution(response)
+    assert not meta["valid"] and meta["error"]
+
+
+def test_code_cache_reuses_compiled_code(tmp_path):
+    cache = CodeCache(str(tmp_path))
+    data = cache.bytecode(CODE)
+    assert cache.bytecode(CODE) == data
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+    # A new cache (e.g. in a later run) finds the compiled code on disk
+    cache = CodeCache(str(tmp_path))
+    assert cache.bytecode(CODE) == data and cache.hits == 1
+    with pytest.raises(SyntaxError):
+        cache.bytecode("class Solution:\n    def broken(self:")
+
+
+def test_normalize_solutions_skips_normalized_entries(dataset_folder):
+    manager = DatasetManager(dataset_folder)
+    manager.add_problems([{"title_slug": "one", "problem": "Problem one"},
+                          {"title_slug": "two", "problem": "Problem two"}], dataset_type="leetcode")
+    sql = "```sql\nSELECT 1;\n```"
+    manager._save_dataset("leetcode", manager._load_dataset("leetcode"), [
+        {"op": "store_solution", "id": "1", "model": "fake", "data": {"solution": f"Answer:\n```python\n{CODE}\n```"}},
+        {"op": "store_solution", "id": "2", "model": "fake", "data": {"solution": sql}},
+    ])
+
+    assert manager.normalize_solutions() == {"normalized": 2, "invalid": [("2", "fake")]}
+    dataset = DatasetManager(dataset_folder)._load_dataset("leetcode")
+    assert dataset["1"]["fake"]["solution"] == CODE
+    assert dataset["2"]["fake"]["solution"] == sql
+    assert os.listdir(os.path.join(dataset_folder, ".cache", "compiled"))
+
+    assert manager.normalize_solutions() == {"normalized": 0, "invalid": []}
@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+
+from scripts.data_manager import REPO_FOLDER, DatasetManager
+from scripts.storage import LazyEntry, JsonFileStorage, SqliteStorage, convert_storage
+
+
+def sqlite_manager(dataset_folder, **kwargs):
+    return DatasetManager(dataset_folder, storage=SqliteStorage(dataset_folder), **kwargs)
+
+
+def add_solved_problem(manager, problem_id="1"):
+    manager.add_problem(f"Problem {problem_id}", "leetcode", title_slug=f"problem-{problem_id}")
+    manager._save_dataset("leetcode", manager._load_dataset("leetcode"), [
+        {"op": "store_solution", "id": problem_id, "model": "fake", "data": {"solution": "class Solution: pass"}}
+    ])
+
+
+def test_eval_keeps_the_unloaded_solution(dataset_folder):
+    add_solved_problem(sqlite_manager(dataset_folder))
+
+    manager = sqlite_manager(dataset_folder)
+    manager.eval("1", "fake", "leetcode", runtime_beats=80, memory_beats=60, feedback="")
+
+    entry = sqlite_manager(dataset_folder)._load_dataset("leetcode")["1"]
+    assert isinstance(entry["fake"], LazyEntry) and not entry["fake"].is_loaded("solution")
+    assert entry["fake"]["runtime_beats"] == 80
+    assert entry["fake"]["solution"] == "class Solution: pass"
+    assert entry["problem"] == "Problem 1"
+
+
+def test_convert_storage_round_trip(tmp_path):
+    source, target = str(tmp_path / "json"), str(tmp_path / "sqlite")
+    os.makedirs(source)
+    os.makedirs(target)
+    for name in ("math_problems.json", "leetcode_problems.json"):
+        shutil.copy(os.path.join(REPO_FOLDER, name), source)
+
+    convert_storage(JsonFileStorage(source), SqliteStorage(target))
+    convert_storage(SqliteStorage(target), JsonFileStorage(target))
+
+    for name in ("math_problems.json", "leetcode_problems.json"):
+        with open(os.path.join(source, name)) as f, open(os.path.join(target, name)) as g:
+            assert json.load(f) == json.load(g)
+
+
+def test_summary_loads_no_text(dataset_folder):
+    writer = sqlite_manager(dataset_folder)
+    for problem_id in ("1", "2"):
+        add_solved_problem(writer, problem_id)
+        writer.eval(problem_id, "fake", "leetcode", runtime_beats=50, memory_beats=50, feedback="")
+
+    manager = sqlite_manager(dataset_folder, in_memory=True)
+    summary = manager.summary("leetcode")
+    manager.compare("fake", "fake", "leetcode", by="length")
+
+    assert summary["fake"]["runtime_beats"]["count"] == 2
+    for entry in manager._load_dataset("leetcode").values():
+        assert not entry.is_loaded("problem")
+        assert not entry["fake"].is_loaded("solution")
+
+
+def test_texts_of_removed_fields_are_deleted(dataset_folder):
+    manager = sqlite_manager(dataset_folder)
+    add_solved_problem(manager)
+    # store_solution replaces the model's entry, here with one that has no solution text
+    manager._save_dataset("leetcode", manager._load_dataset("leetcode"), [
+        {"op": "store_solution", "id": "1", "model": "fake", "data": {"runtime_beats": 10}}
+    ])
+
+    rows = manager.storage._conn.execute("SELECT field FROM texts WHERE dataset = 'leetcode'").fetchall()
+    assert rows == [("problem",)]